@@ -221,16 +221,25 @@ def verify_all():
     print("VERIFICATION")
     print("=" * 60)
 
-    # Check Supabase financial tables
+    # Check Supabase financial tables — one UNION ALL query instead of one
+    # psql process (and Postgres connection) per table.
     print("\n  Supabase Financial Tables:")
-    for table in ["financials", "balance_sheet", "sales_data", "employees", "products", "community_summaries"]:
-        result = subprocess.run(
-            ["psql", SUPABASE_CONN, "-t", "-A", "-c",
-             f"SELECT COUNT(*) FROM {table} WHERE tenant_id = 'benchmark';"],
-            capture_output=True, text=True, timeout=10
-        )
-        count = result.stdout.strip() if result.returncode == 0 else "ERROR"
-        print(f"    {table}: {count} rows")
+    tables = ["financials", "balance_sheet", "sales_data", "employees", "products", "community_summaries"]
+    counts_sql = " UNION ALL ".join(
+        f"SELECT '{t}', COUNT(*) FROM {t} WHERE tenant_id = 'benchmark'" for t in tables
+    ) + ";"
+    result = subprocess.run(
+        ["psql", SUPABASE_CONN, "-t", "-A", "-c", counts_sql],
+        capture_output=True, text=True, timeout=15
+    )
+    if result.returncode == 0:
+        for line in result.stdout.strip().split("\n"):
+            if "|" in line:
+                table, count = line.split("|", 1)
+                print(f"    {table}: {count} rows")
+    else:
+        for table in tables:
+            print(f"    {table}: ERROR")
 
     # Check Supabase benchmark data
     print("\n  Supabase Benchmark Datasets:")
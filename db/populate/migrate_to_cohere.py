@@ -16,7 +16,6 @@ Usage:
 
 import json
 import os
-import sys
 import time
 import urllib.request
 import urllib.error
@@ -35,17 +34,16 @@ RATE_LIMIT_PAUSE = 1.0  # seconds between Cohere batches
 
 def api_request(url, data=None, headers=None, method=None, timeout=30, retries=3):
     """Make HTTP request with retries."""
+    # Encode once — the payload is identical on every retry, so the dumps
+    # and Request construction live outside the attempt loop.
+    encoded = json.dumps(data).encode() if data is not None else None
+    req = urllib.request.Request(url, data=encoded, method=method or ("POST" if encoded else "GET"))
+    req.add_header("Content-Type", "application/json")
+    if headers:
+        for k, v in headers.items():
+            req.add_header(k, v)
     for attempt in range(retries):
         try:
-            if data is not None:
-                encoded = json.dumps(data).encode()
-            else:
-                encoded = None
-            req = urllib.request.Request(url, data=encoded, method=method or ("POST" if encoded else "GET"))
-            req.add_header("Content-Type", "application/json")
-            if headers:
-                for k, v in headers.items():
-                    req.add_header(k, v)
             with urllib.request.urlopen(req, timeout=timeout) as resp:
                 return json.loads(resp.read().decode())
         except urllib.error.HTTPError as e:
@@ -102,10 +100,7 @@ def list_all_ids(host, namespace=""):
 
 
 def fetch_vectors(host, ids, namespace=""):
-    """Fetch vectors with metadata by IDs."""
-    result = pinecone_request(host, "/vectors/fetch", method="GET",
-                               data=None)
-    # Use GET with query params for fetch
+    """Fetch vectors with metadata by IDs (GET with query params)."""
     id_params = "&".join(f"ids={vid}" for vid in ids)
     url = f"{host}/vectors/fetch?namespace={namespace}&{id_params}"
     return api_request(url, headers={"Api-Key": PINECONE_KEY}, method="GET")
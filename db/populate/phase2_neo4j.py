@@ -279,45 +279,34 @@ def extract_entities_heuristic(question, docs):
     return {"entities": entities, "relationships": relationships}
 
 
+# Classification keyword tables, built once instead of per call. Order
+# matters (first match wins) and matching is substring-based on purpose.
+_TYPE_KEYWORDS = (
+    ("Organization", ("university", "college", "inc", "corp", "company",
+                      "group", "foundation", "institute", "academy",
+                      "association", "church", "army", "navy",
+                      "party", "league", "council", "committee")),
+    ("Museum", ("museum", "gallery", "library", "theater", "theatre")),
+    ("City", ("city", "town", "village", "prefecture",
+              "district", "province", "county", "state of",
+              "republic of", "kingdom of")),
+    ("Country", ("united states", "united kingdom", "soviet union")),
+    ("Disease", ("disease", "syndrome", "virus", "cancer",
+                 "fever", "plague", "infection")),
+    ("Technology", ("technology", "software", "algorithm",
+                    "protocol", "engine", "system")),
+    ("Event", ("war", "battle", "revolution", "treaty",
+               "election", "championship", "olympics")),
+)
+
+
 def classify_entity_type(name):
     """Classify an entity name into a type using heuristics."""
     name_lower = name.lower()
 
-    # Organization patterns
-    if any(w in name_lower for w in ["university", "college", "inc", "corp", "company",
-                                      "group", "foundation", "institute", "academy",
-                                      "association", "church", "army", "navy",
-                                      "party", "league", "council", "committee"]):
-        return "Organization"
-
-    # Museum/Cultural patterns
-    if any(w in name_lower for w in ["museum", "gallery", "library", "theater", "theatre"]):
-        return "Museum"
-
-    # Location/City patterns
-    if any(w in name_lower for w in ["city", "town", "village", "prefecture",
-                                      "district", "province", "county", "state of",
-                                      "republic of", "kingdom of"]):
-        return "City"
-
-    # Country patterns
-    if any(w in name_lower for w in ["united states", "united kingdom", "soviet union"]):
-        return "Country"
-
-    # Disease patterns
-    if any(w in name_lower for w in ["disease", "syndrome", "virus", "cancer",
-                                      "fever", "plague", "infection"]):
-        return "Disease"
-
-    # Technology patterns
-    if any(w in name_lower for w in ["technology", "software", "algorithm",
-                                      "protocol", "engine", "system"]):
-        return "Technology"
-
-    # Event patterns
-    if any(w in name_lower for w in ["war", "battle", "revolution", "treaty",
-                                      "election", "championship", "olympics"]):
-        return "Event"
+    for entity_type, keywords in _TYPE_KEYWORDS:
+        if any(w in name_lower for w in keywords):
+            return entity_type
 
     # Person name heuristic (2-4 capitalized words)
     words = name.split()
@@ -113,6 +113,14 @@ def parse_table_data_string(td_str):
     return rows, table_string, headers, num_rows, num_cols
 
 
+# Matches inline JSON 2D arrays like [["h1", "h2"], ["v1", "v2"]].
+# Compiled once — this runs against every TAT-QA context string, and the
+# pattern is complex enough that even re's internal cache lookup shows up.
+_TATQA_TABLE_RE = re.compile(
+    r'\[\s*\[(?:"[^"]*"(?:\s*,\s*"[^"]*")*)\](?:\s*,\s*\[(?:"[^"]*"(?:\s*,\s*"[^"]*")*)\])*\s*\]'
+)
+
+
 def extract_tables_from_tatqa_context(context_str):
     """Extract embedded table data from TAT-QA context strings.
 
@@ -122,8 +130,7 @@ def extract_tables_from_tatqa_context(context_str):
     if not context_str:
         return None, None, [], 0, 0
 
-    pattern = r'\[\s*\[(?:"[^"]*"(?:\s*,\s*"[^"]*")*)\](?:\s*,\s*\[(?:"[^"]*"(?:\s*,\s*"[^"]*")*)\])*\s*\]'
-    matches = re.findall(pattern, context_str)
+    matches = _TATQA_TABLE_RE.findall(context_str)
 
     all_rows = []
     for match in matches:
@@ -8,9 +8,13 @@ proper semantic embeddings for all benchmark questions.
 The WF2 Graph RAG and WF5 Standard RAG workflows use the same embedding
 model for their HyDE queries, so the vectors must be compatible.
 """
+import atexit
 import json
 import os
+from array import array
+import random
 import sys
+import threading
 import time
 import hashlib
 from datetime import datetime
@@ -31,10 +35,53 @@ OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY", "")
 EMBEDDING_MODEL = "text-embedding-3-small"  # 1536-dim, same as WF2/WF5
 EMBEDDING_DIM = 1536
 
+# EMBEDDER=local embeds with a sentence-transformers model instead of the
+# API — no per-token cost or network latency. Only useful against an index
+# whose dimension matches the local model; the production index and the
+# WF2/WF5 workflows expect 1536-dim text-embedding-3-small vectors.
+EMBEDDER = os.environ.get("EMBEDDER", "openai")
+LOCAL_EMBEDDING_MODEL = os.environ.get(
+    "LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
 # Batch sizes
 EMBEDDING_BATCH_SIZE = 100  # OpenAI allows up to 2048 per batch
 PINECONE_BATCH_SIZE = 100   # Pinecone limit per upsert
 
+# Decimal places kept for vector values on the wire. float32 carries ~7
+# significant digits; serializing at full repr length roughly doubles the
+# upsert payload for no recall benefit. Set UPSERT_PRECISION=0 to send
+# full-precision floats.
+UPSERT_PRECISION = int(os.environ.get("UPSERT_PRECISION", "5"))
+
+
+# ============================================================
+# HTTP retry policy
+# ============================================================
+
+def _request_json(req, timeout, attempts=3, label="HTTP"):
+    """Send a prepared request with exponential backoff + jitter.
+
+    Single retry policy for every HTTP helper in this script: retries on
+    429, 5xx and transient network errors; other 4xx fail immediately.
+    The jitter decorrelates concurrent workers so retries don't stampede.
+    Returns parsed JSON (empty body → {}) or None after the final attempt.
+    """
+    for attempt in range(attempts):
+        try:
+            with request.urlopen(req, timeout=timeout) as resp:
+                body = resp.read()
+                return json.loads(body) if body else {}
+        except error.HTTPError as e:
+            err_body = e.read().decode()[:200] if hasattr(e, 'read') else str(e)
+            print(f"    {label} HTTP {e.code} (attempt {attempt+1}/{attempts}): {err_body}")
+            if e.code != 429 and e.code < 500:
+                return None
+        except Exception as e:
+            print(f"    {label} error (attempt {attempt+1}/{attempts}): {e}")
+        if attempt < attempts - 1:
+            time.sleep(min(30, 2 ** attempt) + random.uniform(0, 1))
+    return None
+
 
 # ============================================================
 # Embedding API
@@ -71,49 +118,150 @@ def get_embeddings_openai(texts):
 
     req = request.Request(url, data=body, headers=headers, method="POST")
 
-    for attempt in range(3):
-        try:
-            with request.urlopen(req, timeout=60) as resp:
-                result = json.loads(resp.read())
-                embeddings = [item["embedding"] for item in result["data"]]
-                return embeddings
-        except error.HTTPError as e:
-            err_body = e.read().decode() if hasattr(e, 'read') else str(e)
-            print(f"    Embedding API error (attempt {attempt+1}): {e.code} - {err_body[:200]}")
-            if e.code == 429:  # Rate limited
-                time.sleep(5 * (attempt + 1))
-            elif e.code >= 500:
-                time.sleep(2 ** attempt)
-            else:
-                return None
-        except Exception as e:
-            print(f"    Embedding error (attempt {attempt+1}): {e}")
-            time.sleep(2 ** attempt)
+    result = _request_json(req, timeout=60, label="Embedding API")
+    if result is None:
+        return None
+    # Pack each 1536-dim embedding into a compact float32 buffer (4 bytes
+    # per value vs ~28 for a boxed Python float). Vectors stay packed until
+    # pinecone_upsert serializes them, cutting resident memory ~7x when
+    # thousands of vectors are held before upsert.
+    return [array("f", item["embedding"]) for item in result["data"]]
 
-    return None
 
+_local_model = None
 
-def get_embeddings_batch(texts, batch_size=EMBEDDING_BATCH_SIZE):
-    """Get embeddings for a large list of texts, batching as needed."""
-    all_embeddings = []
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i:i+batch_size]
-        # Truncate texts to avoid token limits (8191 tokens max for text-embedding-3-small)
-        batch = [t[:6000] for t in batch]  # ~1500 tokens per text
 
-        embeddings = get_embeddings_openai(batch)
-        if embeddings is None:
-            print(f"    FAILED to get embeddings for batch {i//batch_size + 1}")
-            # Return None for failed items
-            all_embeddings.extend([None] * len(batch))
-        else:
-            all_embeddings.extend(embeddings)
+def _get_local_model():
+    """Lazily load the sentence-transformers model for EMBEDDER=local."""
+    global _local_model
+    if _local_model is None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            print("ERROR: sentence-transformers not installed.")
+            print("Fix:   pip3 install sentence-transformers")
+            sys.exit(1)
+        _local_model = SentenceTransformer(LOCAL_EMBEDDING_MODEL)
+        dim = _local_model.get_sentence_embedding_dimension()
+        if dim != EMBEDDING_DIM:
+            print(f"  WARNING: {LOCAL_EMBEDDING_MODEL} is {dim}-dim; the production "
+                  f"Pinecone index and WF2/WF5 workflows expect {EMBEDDING_DIM}-dim. "
+                  f"Only upsert to an index created for this model.")
+    return _local_model
+
+
+def get_embeddings_local(texts):
+    """Embed texts with the local sentence-transformers model.
+
+    Texts are encoded length-sorted so each internal batch pads to
+    similar lengths (padding to the longest element wastes most of the
+    compute on mixed-length input); original order is restored before
+    returning.
+    """
+    model = _get_local_model()
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    encoded = model.encode([texts[i] for i in order], batch_size=128,
+                           normalize_embeddings=True, show_progress_bar=False)
+    embeddings = [None] * len(texts)
+    for pos, i in enumerate(order):
+        embeddings[i] = array("f", encoded[pos])
+    return embeddings
+
+
+# Embeddings are cached on disk keyed by SHA256(model | text) — the text
+# built from question + answer + context is deterministic, so re-runs hit
+# the cache and skip the API entirely (cost and latency). One float32
+# binary file per embedding, sharded by the first two hex chars.
+# Disable with EMB_CACHE=0.
+EMBEDDING_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".embedding-cache")
+
+
+def _embedding_cache_path(text):
+    model = LOCAL_EMBEDDING_MODEL if EMBEDDER == "local" else EMBEDDING_MODEL
+    key = hashlib.sha256(f"{model}|{text}".encode()).hexdigest()
+    return os.path.join(EMBEDDING_CACHE_DIR, key[:2], f"{key}.f32")
+
+
+def _embedding_cache_load(text):
+    try:
+        with open(_embedding_cache_path(text), "rb") as f:
+            emb = array("f")
+            emb.frombytes(f.read())
+    except OSError:
+        return None
+    if EMBEDDER != "local" and len(emb) != EMBEDDING_DIM:
+        return None
+    return emb if len(emb) else None
 
-        if i > 0 and i % (batch_size * 5) == 0:
-            print(f"    Embedded {i + len(batch)}/{len(texts)} texts...")
-            time.sleep(0.5)  # Rate limit buffer
 
-    return all_embeddings
+def _embedding_cache_store(text, emb):
+    path = _embedding_cache_path(text)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(emb.tobytes())
+        os.replace(tmp, path)
+    except OSError:
+        pass  # cache is best-effort — never fail the run over it
+
+
+def get_embeddings_batch(texts, batch_size=EMBEDDING_BATCH_SIZE):
+    """Get embeddings for a large list of texts, batching as needed.
+
+    Cached embeddings are served from disk; only misses go to the API.
+    Miss batches are dispatched concurrently (EMB_CONCURRENCY in-flight,
+    default 8) — each embedding call is ~1-2 s of API latency, so serial
+    dispatch made wall-clock time scale linearly with the batch count.
+    Order is preserved by indexing the batches.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    # Truncate texts to avoid token limits (8191 tokens max for
+    # text-embedding-3-small); ~1500 tokens per text. The truncated form
+    # is also the cache key.
+    truncated = [t[:6000] for t in texts]
+    embeddings = [None] * len(truncated)
+
+    use_cache = os.environ.get("EMB_CACHE", "1") != "0"
+    if use_cache:
+        for i, t in enumerate(truncated):
+            embeddings[i] = _embedding_cache_load(t)
+        hits = sum(1 for e in embeddings if e is not None)
+        if hits:
+            print(f"    Embedding cache: {hits}/{len(truncated)} hits")
+
+    miss_idx = [i for i, e in enumerate(embeddings) if e is None]
+    chunks = [miss_idx[i:i+batch_size] for i in range(0, len(miss_idx), batch_size)]
+    if not chunks:
+        return embeddings
+
+    # Local model runs single-threaded (it saturates the device on its
+    # own); API misses fan out across EMB_CONCURRENCY requests.
+    embed_fn = get_embeddings_local if EMBEDDER == "local" else get_embeddings_openai
+    concurrency = 1 if EMBEDDER == "local" else max(1, int(os.environ.get("EMB_CONCURRENCY", "8")))
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+        futures = {executor.submit(embed_fn,
+                                   [truncated[j] for j in chunk]): chunk
+                   for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            chunk_embeddings = future.result()
+            if chunk_embeddings is None:
+                print(f"    FAILED to get embeddings for a batch of {len(chunk)}")
+                continue
+            for j, emb in zip(chunk, chunk_embeddings):
+                embeddings[j] = emb
+                if use_cache:
+                    _embedding_cache_store(truncated[j], emb)
+            done += 1
+            if done % 5 == 0:
+                print(f"    Embedded ~{min(done * batch_size, len(miss_idx))}/{len(miss_idx)} texts...")
+
+    return embeddings
 
 
 # ============================================================
@@ -128,21 +276,37 @@ def pinecone_describe_index():
         data=b"{}",
         method="POST"
     )
-    try:
-        with request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read())
-    except Exception as e:
-        print(f"  Pinecone describe error: {e}")
-        return None
+    return _request_json(req, timeout=15, label="Pinecone describe")
 
 
 def pinecone_upsert(vectors, namespace):
-    """Upsert vectors to Pinecone."""
-    total = 0
-    for i in range(0, len(vectors), PINECONE_BATCH_SIZE):
-        batch = vectors[i:i+PINECONE_BATCH_SIZE]
-        body = json.dumps({"vectors": batch, "namespace": namespace}).encode()
-
+    """Upsert vectors to Pinecone.
+
+    100-vector batches are independent REST calls, so they're dispatched
+    through a thread pool (PINECONE_POOL_THREADS in flight, default 8)
+    instead of serially — upsert wall time scales with the slowest batch
+    rather than the batch count.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    batches = [vectors[i:i+PINECONE_BATCH_SIZE]
+               for i in range(0, len(vectors), PINECONE_BATCH_SIZE)]
+    if not batches:
+        return 0
+
+    if UPSERT_PRECISION > 0:
+        def _unpack(emb):
+            return [round(v, UPSERT_PRECISION) for v in emb]
+    else:
+        _unpack = list
+
+    def upsert_batch(batch):
+        # default= unpacks array("f") embedding buffers at serialization
+        # time, one batch at a time (rounded per UPSERT_PRECISION), instead
+        # of materializing float lists up front for every vector. Compact
+        # separators drop the whitespace bytes from ~150k-value payloads.
+        body = json.dumps({"vectors": batch, "namespace": namespace},
+                          separators=(",", ":"), default=_unpack).encode()
         req = request.Request(
             f"{PINECONE_HOST}/vectors/upsert",
             data=body,
@@ -152,19 +316,17 @@ def pinecone_upsert(vectors, namespace):
             },
             method="POST"
         )
-        for attempt in range(3):
-            try:
-                with request.urlopen(req, timeout=30) as resp:
-                    result = json.loads(resp.read())
-                    total += result.get("upsertedCount", len(batch))
-                    break
-            except Exception as e:
-                if attempt < 2:
-                    time.sleep(2 ** attempt)
-                else:
-                    print(f"    Pinecone upsert error: {e}")
+        result = _request_json(req, timeout=30, label="Pinecone upsert")
+        if result is None:
+            return 0
+        return result.get("upsertedCount", len(batch))
 
-    return total
+    pool_threads = max(1, int(os.environ.get("PINECONE_POOL_THREADS", "8")))
+    if pool_threads == 1 or len(batches) == 1:
+        return sum(upsert_batch(batch) for batch in batches)
+
+    with ThreadPoolExecutor(max_workers=min(pool_threads, len(batches))) as executor:
+        return sum(executor.map(upsert_batch, batches))
 
 
 def pinecone_delete_namespace(namespace):
@@ -179,80 +341,110 @@ def pinecone_delete_namespace(namespace):
         },
         method="POST"
     )
-    try:
-        with request.urlopen(req, timeout=15) as resp:
-            return True
-    except Exception as e:
-        print(f"    Delete namespace error: {e}")
-        return False
+    return _request_json(req, timeout=15, label="Pinecone delete") is not None
 
 
 # ============================================================
 # Supabase data fetching
 # ============================================================
-
-def fetch_questions(dataset_name=None, limit=1000, offset=0):
-    """Fetch questions from Supabase benchmark_datasets."""
-    import subprocess
-
+# One long-lived psycopg2 connection shared by all fetches — each psql
+# subprocess paid process spawn + TLS handshake + auth (~300-500 ms),
+# and the ingestion loop makes dozens of these calls. The lock serializes
+# cursor use when datasets are processed concurrently (psycopg2
+# connections are not safe for concurrent cursors).
+_conn = None
+_conn_lock = threading.Lock()
+
+
+def _get_connection():
+    """Get (or lazily create) the shared psycopg2 connection to Supabase."""
+    global _conn
+    if _conn is None or _conn.closed:
+        try:
+            import psycopg2
+        except ImportError:
+            print("ERROR: psycopg2 not installed.")
+            print("Fix:   pip3 install psycopg2-binary")
+            sys.exit(1)
+        _conn = psycopg2.connect(SUPABASE_CONN, connect_timeout=30)
+        _conn.autocommit = True
+        atexit.register(_conn.close)
+    return _conn
+
+
+def fetch_questions(dataset_name=None, limit=1000, after=None):
+    """Fetch a page of questions from Supabase benchmark_datasets.
+
+    Pages use keyset pagination on (split, item_index) — pass the last
+    row's key as `after` to get the next page. OFFSET made Postgres
+    re-scan all skipped rows per page, so a full-dataset fetch cost
+    O(N^2 / page); the keyset predicate seeks straight to the page.
+    """
     where = "WHERE tenant_id = 'benchmark'"
+    params = []
     if dataset_name:
-        where += f" AND dataset_name = '{dataset_name}'"
+        where += " AND dataset_name = %s"
+        params.append(dataset_name)
+    if after is not None:
+        where += " AND (split, item_index) > (%s, %s)"
+        params.extend(after)
 
     sql = f"""SELECT dataset_name, category, split, item_index, question, expected_answer, context
     FROM benchmark_datasets
     {where}
-    ORDER BY dataset_name, item_index
-    LIMIT {limit} OFFSET {offset};"""
+    ORDER BY split, item_index
+    LIMIT %s;"""
+    params.append(limit)
 
-    result = subprocess.run(
-        ["psql", SUPABASE_CONN, "-t", "-A", "-F", "\t", "-c", sql],
-        capture_output=True, text=True, timeout=30
-    )
-
-    if result.returncode != 0:
-        print(f"  Supabase error: {result.stderr[:300]}")
+    try:
+        with _conn_lock, _get_connection().cursor() as cur:
+            cur.execute(sql, params)
+            raw_rows = cur.fetchall()
+    except Exception as e:
+        print(f"  Supabase error: {str(e)[:300]}")
         return []
 
     rows = []
-    for line in result.stdout.strip().split("\n"):
-        if not line.strip():
-            continue
-        parts = line.split("\t")
-        if len(parts) < 5:
-            continue
+    for parts in raw_rows:
         rows.append({
             "dataset_name": parts[0],
             "category": parts[1],
             "split": parts[2],
             "item_index": int(parts[3]),
             "question": parts[4],
-            "expected_answer": parts[5] if len(parts) > 5 else "",
-            "context": parts[6] if len(parts) > 6 else None
+            "expected_answer": parts[5] or "",
+            "context": parts[6]
         })
 
     return rows
 
 
+def stream_questions(dataset_name, page_size=500):
+    """Yield pages of questions for a dataset without materializing it all."""
+    after = None
+    while True:
+        page = fetch_questions(dataset_name, limit=page_size, after=after)
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+        after = (last["split"], last["item_index"])
+
+
 def get_dataset_names():
     """Get list of distinct dataset names from Supabase."""
-    import subprocess
     sql = "SELECT DISTINCT dataset_name, COUNT(*) as cnt FROM benchmark_datasets WHERE tenant_id = 'benchmark' GROUP BY dataset_name ORDER BY cnt DESC;"
-    result = subprocess.run(
-        ["psql", SUPABASE_CONN, "-t", "-A", "-F", "\t", "-c", sql],
-        capture_output=True, text=True, timeout=15
-    )
-    if result.returncode != 0:
+    try:
+        with _conn_lock, _get_connection().cursor() as cur:
+            cur.execute(sql)
+            raw_rows = cur.fetchall()
+    except Exception as e:
+        print(f"  Supabase error: {str(e)[:300]}")
         return []
 
-    datasets = []
-    for line in result.stdout.strip().split("\n"):
-        if not line.strip():
-            continue
-        parts = line.split("\t")
-        if len(parts) >= 2:
-            datasets.append({"name": parts[0], "count": int(parts[1])})
-    return datasets
+    return [{"name": name, "count": int(cnt)} for name, cnt in raw_rows]
 
 
 # ============================================================
@@ -287,86 +479,91 @@ def populate_embeddings():
     for ds in datasets:
         print(f"   {ds['name']}: {ds['count']} questions")
 
-    total_embedded = 0
-    total_upserted = 0
+    # Datasets are independent fetch → embed → upsert pipelines, so a few
+    # can run concurrently (DATASET_CONCURRENCY, default 3) and overlap
+    # their network waits. Counters are summed from the returned results
+    # after the pool drains — no shared state between workers.
+    from concurrent.futures import ThreadPoolExecutor, as_completed
 
-    # Process each dataset
-    for ds in datasets:
+    def process_dataset(ds):
         ds_name = ds["name"]
         ds_count = ds["count"]
         namespace = f"benchmark-{ds_name}"
 
-        print(f"\n{'='*50}")
-        print(f"Processing: {ds_name} ({ds_count} questions)")
-        print(f"Namespace: {namespace}")
-        print(f"{'='*50}")
+        print(f"\n  [{ds_name}] Starting ({ds_count} questions, namespace '{namespace}')")
 
         # Delete old pseudo-vectors in this namespace
-        print(f"  Clearing old vectors in namespace '{namespace}'...")
         pinecone_delete_namespace(namespace)
         time.sleep(1)
 
-        # Fetch all questions for this dataset
-        all_questions = []
-        offset = 0
-        while offset < ds_count:
-            batch = fetch_questions(ds_name, limit=500, offset=offset)
-            if not batch:
-                break
-            all_questions.extend(batch)
-            offset += len(batch)
-
-        print(f"  Fetched {len(all_questions)} questions from Supabase")
-
-        # Build text for embedding: question + context snippet
-        texts = []
-        for q in all_questions:
-            # Combine question + answer + context for richer embedding
-            text = q["question"]
-            if q.get("expected_answer"):
-                text += f"\nAnswer: {q['expected_answer']}"
-            if q.get("context"):
-                ctx = q["context"]
-                if isinstance(ctx, str) and len(ctx) > 50:
-                    text += f"\nContext: {ctx[:2000]}"
-            texts.append(text)
-
-        # Get real embeddings
-        print(f"  Getting embeddings ({EMBEDDING_MODEL})...")
-        embeddings = get_embeddings_batch(texts)
-
-        # Build Pinecone vectors
-        vectors = []
+        # Stream pages of questions and embed/upsert page by page — peak
+        # memory stays at one page of questions + vectors instead of the
+        # whole dataset.
+        fetched = 0
         skipped = 0
-        for i, (q, emb) in enumerate(zip(all_questions, embeddings)):
-            if emb is None:
-                skipped += 1
-                continue
-
-            vec_id = f"bench-{ds_name}-{q['split']}-{q['item_index']}"
-            vectors.append({
-                "id": vec_id,
-                "values": emb,
-                "metadata": {
-                    "dataset_name": ds_name,
-                    "category": q["category"],
-                    "item_index": q["item_index"],
-                    "question": q["question"][:400],
-                    "expected_answer": (q.get("expected_answer") or "")[:400],
-                    "tenant_id": "benchmark"
-                }
-            })
+        embedded = 0
+        upserted = 0
+        for page in stream_questions(ds_name, page_size=500):
+            fetched += len(page)
+
+            # Build text for embedding: question + answer + context snippet
+            texts = []
+            for q in page:
+                text = q["question"]
+                if q.get("expected_answer"):
+                    text += f"\nAnswer: {q['expected_answer']}"
+                if q.get("context"):
+                    ctx = q["context"]
+                    if isinstance(ctx, str) and len(ctx) > 50:
+                        text += f"\nContext: {ctx[:2000]}"
+                texts.append(text)
+
+            embeddings = get_embeddings_batch(texts)
+
+            # Build Pinecone vectors
+            vectors = []
+            for q, emb in zip(page, embeddings):
+                if emb is None:
+                    skipped += 1
+                    continue
+
+                vec_id = f"bench-{ds_name}-{q['split']}-{q['item_index']}"
+                vectors.append({
+                    "id": vec_id,
+                    "values": emb,
+                    "metadata": {
+                        "dataset_name": ds_name,
+                        "category": q["category"],
+                        "item_index": q["item_index"],
+                        "question": q["question"][:400],
+                        "expected_answer": (q.get("expected_answer") or "")[:400],
+                        "tenant_id": "benchmark"
+                    }
+                })
+
+            embedded += len(vectors)
+            upserted += pinecone_upsert(vectors, namespace)
+            print(f"  [{ds_name}] {fetched}/{ds_count} fetched, {upserted} upserted...")
 
         if skipped:
-            print(f"  WARNING: {skipped} embeddings failed, skipped")
+            print(f"  [{ds_name}] WARNING: {skipped} embeddings failed, skipped")
+        print(f"  [{ds_name}] Upserted: {upserted}/{embedded} vectors")
+        return embedded, upserted
 
-        # Upsert to Pinecone
-        print(f"  Upserting {len(vectors)} vectors to Pinecone...")
-        upserted = pinecone_upsert(vectors, namespace)
-        print(f"  Upserted: {upserted} vectors")
+    total_embedded = 0
+    total_upserted = 0
+    ds_concurrency = max(1, int(os.environ.get("DATASET_CONCURRENCY", "3")))
 
-        total_embedded += len(vectors)
-        total_upserted += upserted
+    with ThreadPoolExecutor(max_workers=min(ds_concurrency, len(datasets))) as executor:
+        futures = {executor.submit(process_dataset, ds): ds["name"] for ds in datasets}
+        for future in as_completed(futures):
+            try:
+                embedded, upserted = future.result()
+            except Exception as e:
+                print(f"  [{futures[future]}] FAILED: {str(e)[:200]}")
+                continue
+            total_embedded += embedded
+            total_upserted += upserted
 
     # Final stats
     print(f"\n{'='*60}")
@@ -9,13 +9,48 @@ Steps:
 4. Trigger WF-Benchmark-RAG-Tester for ready datasets
 5. Trigger WF-Benchmark-Orchestrator-Tester for routing evaluation
 """
+import http.client
 import json
 import os
 import sys
+import threading
 import time
 import copy
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
 from datetime import datetime
-from urllib import request, error, parse
+from urllib.parse import urlsplit
+
+# orjson is ~3-5x faster than stdlib json for the webhook responses and
+# result files this script shuttles around. Optional — falls back to the
+# stdlib when the wheel isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps_bytes = orjson.dumps
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    _json_dumps_bytes = lambda obj: json.dumps(obj).encode('utf-8')
+
+
+def _load_json_file(path):
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+
+def _dump_json_file(obj, path):
+    """Write JSON atomically — tmp file then os.replace, so a crash or a
+    concurrent reader never sees a truncated result file."""
+    tmp = path + '.tmp'
+    if orjson is not None:
+        with open(tmp, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp, 'w') as f:
+            json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
 
 # ============================================================
 # Configuration
@@ -23,6 +58,17 @@ from urllib import request, error, parse
 N8N_HOST = os.environ.get("N8N_HOST", "http://34.136.180.66:5678")
 N8N_API_KEY = os.environ.get("N8N_API_KEY", "")
 
+# Datasets ingested in parallel. Each ingestion is an independent n8n
+# execution that mostly waits on remote I/O, so wall time approaches
+# max-of-latencies instead of sum. Set to 1 for the old serial behavior.
+INGEST_CONCURRENCY = int(os.environ.get("INGEST_CONCURRENCY", "4"))
+
+# Optional fan-out path: when an n8n workflow exposing a batch-ingestion
+# webhook exists (one execution that SplitInBatches over all datasets),
+# set this to its path and the 16 per-dataset webhook calls collapse into
+# one, paying workflow cold-start once. Empty = per-dataset calls.
+INGEST_BATCH_WEBHOOK = os.environ.get("INGEST_BATCH_WEBHOOK", "")
+
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 WORKFLOWS_DIR = os.path.join(REPO_ROOT, "workflows")
 RESULTS_DIR = os.path.join(REPO_ROOT, "dataset-results")
@@ -34,48 +80,109 @@ WORKFLOW_FILES = [
     "WF-Benchmark-Monitoring.json",
 ]
 
-# All datasets to ingest — ordered by priority (most complex first)
+# All datasets to ingest — ordered by priority (most complex first).
+# NamedTuple rather than dicts: field access is a C slot read instead of a
+# dict probe, defaults replace the .get() calls that were scattered over
+# the ingestion loop, and typos become AttributeErrors instead of silent
+# defaults.
+class Dataset(NamedTuple):
+    name: str
+    sample_size: int
+    rag_target: str = "standard"
+    include_neo4j: bool = False
+
+
 ALL_DATASETS = [
     # TIER 1: Graph RAG (Multi-Hop) — needs Neo4j
-    {"name": "musique", "sample_size": 200, "include_neo4j": True, "rag_target": "graph"},
-    {"name": "2wikimultihopqa", "sample_size": 300, "include_neo4j": True, "rag_target": "graph"},
-    {"name": "hotpotqa", "sample_size": 1000, "include_neo4j": True, "rag_target": "standard"},
+    Dataset("musique", 200, "graph", include_neo4j=True),
+    Dataset("2wikimultihopqa", 300, "graph", include_neo4j=True),
+    Dataset("hotpotqa", 1000, include_neo4j=True),
     # TIER 2: Quantitative RAG — needs Supabase SQL tables
-    {"name": "finqa", "sample_size": 200, "rag_target": "quantitative"},
-    {"name": "tatqa", "sample_size": 150, "rag_target": "quantitative"},
-    {"name": "convfinqa", "sample_size": 100, "rag_target": "quantitative"},
-    {"name": "wikitablequestions", "sample_size": 50, "rag_target": "quantitative"},
+    Dataset("finqa", 200, "quantitative"),
+    Dataset("tatqa", 150, "quantitative"),
+    Dataset("convfinqa", 100, "quantitative"),
+    Dataset("wikitablequestions", 50, "quantitative"),
     # TIER 3: Standard RAG Benchmarks
-    {"name": "frames", "sample_size": 1000, "rag_target": "standard"},
-    {"name": "triviaqa", "sample_size": 1000, "rag_target": "standard"},
-    {"name": "squad_v2", "sample_size": 1000, "rag_target": "standard"},
-    {"name": "popqa", "sample_size": 1000, "rag_target": "standard"},
-    {"name": "msmarco", "sample_size": 1000, "rag_target": "standard"},
-    {"name": "asqa", "sample_size": 1000, "rag_target": "standard"},
-    {"name": "narrativeqa", "sample_size": 1000, "rag_target": "standard"},
-    {"name": "pubmedqa", "sample_size": 500, "rag_target": "standard"},
-    {"name": "natural_questions", "sample_size": 1000, "rag_target": "standard"},
+    Dataset("frames", 1000),
+    Dataset("triviaqa", 1000),
+    Dataset("squad_v2", 1000),
+    Dataset("popqa", 1000),
+    Dataset("msmarco", 1000),
+    Dataset("asqa", 1000),
+    Dataset("narrativeqa", 1000),
+    Dataset("pubmedqa", 500),
+    Dataset("natural_questions", 1000),
 ]
 
+# Hoisted invariants — referenced from banner prints, progress lines and
+# the worker-pool sizing below.
+N_DATASETS = len(ALL_DATASETS)
+TOTAL_TARGET_ITEMS = sum(d.sample_size for d in ALL_DATASETS)
+
+
+# Per-thread keep-alive connections, keyed by (scheme, host). With
+# INGEST_CONCURRENCY workers this gives N parallel HTTP/1.1 connections —
+# the stdlib's answer to multiplexing; each worker pays the TCP handshake
+# once instead of per call like urllib did.
+_conn_local = threading.local()
+
+
+def _pooled_request(method, url, body, headers, timeout):
+    """Send a request over a per-thread keep-alive connection.
+    Returns (status, raw_bytes). Reconnects once if the pooled socket
+    went stale (server closed it between calls)."""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    conns = getattr(_conn_local, "conns", None)
+    if conns is None:
+        conns = _conn_local.conns = {}
+
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    for attempt in range(2):
+        conn = conns.get(key)
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(parts.netloc, timeout=timeout)
+            conns[key] = conn
+        elif conn.timeout != timeout:
+            # API calls (60s) and webhook triggers (120s+) share the same
+            # host — retune the existing socket instead of keeping one
+            # connection per distinct timeout.
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conns.pop(key, None)
+            if attempt == 1:
+                raise
+
+
+# Headers never vary between calls — built once instead of per request.
+# Webhook POSTs intentionally carry no API key: n8n webhooks are
+# unauthenticated endpoints, only the REST API needs the key.
+_API_HEADERS = {
+    "X-N8N-API-KEY": N8N_API_KEY,
+    "Accept": "application/json",
+    "Content-Type": "application/json"
+}
+_WEBHOOK_HEADERS = {"Content-Type": "application/json"}
+
 
 def api_request(method, endpoint, data=None, timeout=60):
     """Make a request to the n8n REST API."""
     url = f"{N8N_HOST}/api/v1{endpoint}"
-    headers = {
-        "X-N8N-API-KEY": N8N_API_KEY,
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
-    body = json.dumps(data).encode('utf-8') if data else None
-    req = request.Request(url, data=body, headers=headers, method=method)
+    body = _json_dumps_bytes(data) if data else None
     for attempt in range(3):
         try:
-            with request.urlopen(req, timeout=timeout) as resp:
-                response_data = resp.read().decode('utf-8')
-                return {"status": resp.status, "data": json.loads(response_data) if response_data else None}
-        except error.HTTPError as e:
-            error_body = e.read().decode('utf-8') if e.fp else ''
-            return {"status": e.code, "error": str(e), "body": error_body}
+            status, raw = _pooled_request(method, url, body, _API_HEADERS, timeout)
+            if status >= 400:
+                return {"status": status, "error": f"HTTP Error {status}", "body": raw.decode('utf-8')}
+            return {"status": status, "data": _json_loads(raw) if raw else None}
         except Exception as e:
             if attempt < 2:
                 time.sleep(2 ** attempt)
@@ -86,21 +193,13 @@ def api_request(method, endpoint, data=None, timeout=60):
 def webhook_request(path, data, timeout=120):
     """Trigger an n8n webhook."""
     url = f"{N8N_HOST}/webhook/{path}"
-    body = json.dumps(data).encode('utf-8')
-    headers = {"Content-Type": "application/json"}
-    req = request.Request(url, data=body, headers=headers, method="POST")
+    body = _json_dumps_bytes(data)
     for attempt in range(3):
         try:
-            with request.urlopen(req, timeout=timeout) as resp:
-                response_data = resp.read().decode('utf-8')
-                return {"status": resp.status, "data": json.loads(response_data) if response_data else None}
-        except error.HTTPError as e:
-            error_body = ''
-            try:
-                error_body = e.read().decode('utf-8')
-            except Exception:
-                pass
-            return {"status": e.code, "error": str(e), "body": error_body}
+            status, raw = _pooled_request("POST", url, body, _WEBHOOK_HEADERS, timeout)
+            if status >= 400:
+                return {"status": status, "error": f"HTTP Error {status}", "body": raw.decode('utf-8')}
+            return {"status": status, "data": _json_loads(raw) if raw else None}
         except Exception as e:
             if attempt < 2:
                 print(f"      Retry {attempt+1}/3: {e}")
@@ -163,8 +262,7 @@ def deploy_workflows():
             print(f"  SKIP: {filename} not found")
             continue
 
-        with open(filepath, 'r') as f:
-            wf_data = json.load(f)
+        wf_data = _load_json_file(filepath)
 
         wf_name = wf_data.get("name", filename)
         prepared = prepare_workflow(wf_data)
@@ -203,63 +301,152 @@ def deploy_workflows():
 # ============================================================
 # PHASE 2: Trigger Dataset Ingestion
 # ============================================================
-def ingest_all_datasets():
-    """Trigger WF-Benchmark-Dataset-Ingestion for each dataset."""
-    print("\n" + "=" * 70)
-    print("PHASE 2: TRIGGERING DATASET INGESTION VIA BENCHMARK WORKFLOW")
-    print("=" * 70)
-    print(f"  Total datasets: {len(ALL_DATASETS)}")
-    print(f"  Total target Q&A: {sum(d['sample_size'] for d in ALL_DATASETS)}")
 
-    ingestion_results = []
+# Payload templates — constant apart from the per-dataset fields, so built
+# once here instead of re-allocated per webhook call (same pattern as the
+# smoke tester's base payload).
+_INGEST_BASE_PAYLOAD = {
+    "batch_size": 50,
+    "generate_embeddings": True,
+    "tenant_id": "benchmark",
+}
+_TEST_BASE_PAYLOAD = {
+    "test_type": "e2e",
+    "batch_size": 10,
+    "tenant_id": "benchmark",
+}
+
+
+def _apply_webhook_outcome(result, resp):
+    """Fill the status/run_id/error fields shared by every phase trigger.
+
+    Phases 2-4 all end with the same bookkeeping on their webhook
+    response; it lives here once. Returns the response "data" payload on
+    success so the caller can pull its phase-specific fields, or None on
+    error (result["error"] is set, truncated to 500 chars)."""
+    data = resp.get("data")
+    if data:
+        result["status"] = "completed"
+        result["run_id"] = data.get("run_id", "")
+        return data
+    result["status"] = "error"
+    result["error"] = resp.get("error", resp.get("body", "unknown"))[:500]
+    return None
+
+
+def ingest_dataset(ds):
+    """Trigger WF-Benchmark-Dataset-Ingestion for one dataset.
+    Safe to run in a worker thread — prints are single-call and prefixed."""
+    name = ds.name
+    size = ds.sample_size
+    print(f"  [{name}] Ingesting {size} items "
+          f"(rag_target={ds.rag_target}, "
+          f"neo4j={ds.include_neo4j})")
+
+    start_time = time.monotonic()
+
+    payload = {
+        **_INGEST_BASE_PAYLOAD,
+        "dataset_name": name,
+        "sample_size": size,
+        "include_neo4j": ds.include_neo4j,
+    }
 
-    for idx, ds in enumerate(ALL_DATASETS):
-        name = ds["name"]
-        size = ds["sample_size"]
-        print(f"\n  [{idx+1}/{len(ALL_DATASETS)}] Ingesting: {name} ({size} items)")
-        print(f"    RAG target: {ds.get('rag_target', 'standard')}")
-        print(f"    Neo4j: {ds.get('include_neo4j', False)}")
+    resp = webhook_request("benchmark-ingest", payload, timeout=300)
+    elapsed = time.monotonic() - start_time
 
-        start_time = time.time()
+    result = {
+        "name": name,
+        "sample_size": size,
+        "rag_target": ds.rag_target,
+        "duration_s": round(elapsed, 1),
+        "timestamp": datetime.now().isoformat()
+    }
 
-        payload = {
-            "dataset_name": name,
-            "sample_size": size,
-            "batch_size": 50,
-            "include_neo4j": ds.get("include_neo4j", False),
-            "generate_embeddings": True,
-            "tenant_id": "benchmark"
-        }
+    data = _apply_webhook_outcome(result, resp)
+    if data is not None:
+        result["total_items"] = data.get("total_items", 0)
+        result["webhook_response"] = data
+        print(f"  [{name}] SUCCESS: {data.get('total_items', '?')} items ingested "
+              f"in {result['duration_s']}s (run {data.get('run_id', '?')})")
+    else:
+        print(f"  [{name}] ERROR: {result['error'][:200]}")
 
-        resp = webhook_request("benchmark-ingest", payload, timeout=300)
-        elapsed = time.time() - start_time
+    return result
 
+
+def ingest_datasets_batch():
+    """Trigger one batch-ingestion webhook covering every dataset.
+
+    The workflow behind INGEST_BATCH_WEBHOOK receives the full dataset
+    list and fans out internally, so workflow startup is paid once instead
+    of per dataset. Expects {"results": [...]} back, one entry per
+    dataset; anything missing from the response is reported as an error."""
+    print(f"  Batch webhook: {INGEST_BATCH_WEBHOOK}")
+    start_time = time.monotonic()
+    payload = {
+        "datasets": [ds._asdict() for ds in ALL_DATASETS],
+        "batch_size": 50,
+        "generate_embeddings": True,
+        "tenant_id": "benchmark",
+    }
+    resp = webhook_request(INGEST_BATCH_WEBHOOK, payload, timeout=1800)
+    elapsed = round(time.monotonic() - start_time, 1)
+    now_iso = datetime.now().isoformat()
+
+    returned = {}
+    if resp.get("data"):
+        for entry in resp["data"].get("results", []):
+            if isinstance(entry, dict) and entry.get("dataset_name"):
+                returned[entry["dataset_name"]] = entry
+
+    ingestion_results = []
+    for ds in ALL_DATASETS:
+        entry = returned.get(ds.name)
         result = {
-            "name": name,
-            "sample_size": size,
-            "rag_target": ds.get("rag_target", "standard"),
-            "duration_s": round(elapsed, 1),
-            "timestamp": datetime.now().isoformat()
+            "name": ds.name,
+            "sample_size": ds.sample_size,
+            "rag_target": ds.rag_target,
+            "duration_s": elapsed,
+            "timestamp": now_iso,
         }
-
-        if resp.get("data"):
-            data = resp["data"]
+        if entry and not entry.get("error"):
             result["status"] = "completed"
-            result["run_id"] = data.get("run_id", "")
-            result["total_items"] = data.get("total_items", 0)
-            result["webhook_response"] = data
-            print(f"    SUCCESS: {data.get('total_items', '?')} items ingested in {result['duration_s']}s")
-            print(f"    Run ID: {data.get('run_id', '?')}")
+            result["run_id"] = entry.get("run_id", "")
+            result["total_items"] = entry.get("total_items", 0)
+            result["webhook_response"] = entry
+            print(f"  [{ds.name}] SUCCESS: {entry.get('total_items', '?')} items ingested")
         else:
             result["status"] = "error"
-            result["error"] = resp.get("error", resp.get("body", "unknown"))[:500]
-            print(f"    ERROR: {result['error'][:200]}")
-
+            result["error"] = (entry or resp).get("error", resp.get("body", "missing from batch response"))[:500]
+            print(f"  [{ds.name}] ERROR: {result['error'][:200]}")
         ingestion_results.append(result)
+    return ingestion_results
 
-        # Brief pause between datasets to avoid overwhelming n8n
-        if idx < len(ALL_DATASETS) - 1:
-            time.sleep(2)
+
+def ingest_all_datasets():
+    """Trigger WF-Benchmark-Dataset-Ingestion for each dataset.
+
+    Datasets are independent, so up to INGEST_CONCURRENCY ingestions run
+    at once; results come back in the original ALL_DATASETS order."""
+    print("\n" + "=" * 70)
+    print("PHASE 2: TRIGGERING DATASET INGESTION VIA BENCHMARK WORKFLOW")
+    print("=" * 70)
+    print(f"  Total datasets: {N_DATASETS}")
+    print(f"  Total target Q&A: {TOTAL_TARGET_ITEMS}")
+
+    if INGEST_BATCH_WEBHOOK:
+        return ingest_datasets_batch()
+
+    print(f"  Concurrency: {INGEST_CONCURRENCY}")
+
+    ingestion_results = [None] * N_DATASETS
+    workers = max(1, min(INGEST_CONCURRENCY, N_DATASETS))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(ingest_dataset, ds): idx
+                   for idx, ds in enumerate(ALL_DATASETS)}
+        for future in as_completed(futures):
+            ingestion_results[futures[future]] = future.result()
 
     return ingestion_results
 
@@ -267,56 +454,86 @@ def ingest_all_datasets():
 # ============================================================
 # PHASE 3: Trigger RAG Testing for ingested datasets
 # ============================================================
-def test_rag_datasets(ingestion_results):
-    """Trigger WF-Benchmark-RAG-Tester for successfully ingested datasets."""
-    print("\n" + "=" * 70)
-    print("PHASE 3: TRIGGERING RAG TESTS VIA BENCHMARK WORKFLOW")
-    print("=" * 70)
+def test_rag_dataset(ds):
+    """Trigger WF-Benchmark-RAG-Tester for one ingested dataset.
+    Safe to run in a worker thread — prints are single-call and prefixed."""
+    name = ds["name"]
+    rag_target = ds.get("rag_target", "standard")
+    print(f"  [{name}] Testing (rag_target={rag_target})")
+
+    payload = {
+        **_TEST_BASE_PAYLOAD,
+        "dataset_name": name,
+        "rag_target": rag_target,
+        "sample_size": min(ds.get("sample_size", 100), 100),  # Test first 100
+    }
 
-    completed = [r for r in ingestion_results if r.get("status") == "completed"]
-    print(f"  Datasets ready for testing: {len(completed)}/{len(ingestion_results)}")
+    start_time = time.monotonic()
+    resp = webhook_request("benchmark-test-rag", payload, timeout=300)
+    elapsed = time.monotonic() - start_time
 
-    test_results = []
-    for idx, ds in enumerate(completed):
-        name = ds["name"]
-        rag_target = ds.get("rag_target", "standard")
-        print(f"\n  [{idx+1}/{len(completed)}] Testing: {name} (rag_target={rag_target})")
+    result = {
+        "name": name,
+        "rag_target": rag_target,
+        "duration_s": round(elapsed, 1),
+        "timestamp": datetime.now().isoformat()
+    }
 
-        payload = {
-            "dataset_name": name,
-            "test_type": "e2e",
-            "rag_target": rag_target,
-            "sample_size": min(ds.get("sample_size", 100), 100),  # Test first 100
-            "batch_size": 10,
-            "tenant_id": "benchmark"
-        }
+    data = _apply_webhook_outcome(result, resp)
+    if data is not None:
+        result["metrics"] = data.get("aggregate_metrics", {})
+        print(f"  [{name}] SUCCESS in {result['duration_s']}s")
+    else:
+        print(f"  [{name}] ERROR: {result['error'][:200]}")
+        # Only back off when n8n actually pushed back — successful tests
+        # already pace themselves by their own multi-second duration
+        time.sleep(2)
 
-        start_time = time.time()
-        resp = webhook_request("benchmark-test-rag", payload, timeout=300)
-        elapsed = time.time() - start_time
+    return result
 
-        result = {
-            "name": name,
-            "rag_target": rag_target,
-            "duration_s": round(elapsed, 1),
-            "timestamp": datetime.now().isoformat()
-        }
 
-        if resp.get("data"):
-            data = resp["data"]
-            result["status"] = "completed"
-            result["run_id"] = data.get("run_id", "")
-            result["metrics"] = data.get("aggregate_metrics", {})
-            print(f"    SUCCESS in {result['duration_s']}s")
+def test_rag_datasets(ingestion_results):
+    """Trigger WF-Benchmark-RAG-Tester for successfully ingested datasets.
+
+    Per-dataset tests are independent n8n executions, so they run under
+    the same bounded pool as ingestion; results keep ingestion order."""
+    print("\n" + "=" * 70)
+    print("PHASE 3: TRIGGERING RAG TESTS VIA BENCHMARK WORKFLOW")
+    print("=" * 70)
+
+    # Gate on actual data, not just webhook success — a dataset whose
+    # ingestion "completed" with 0 items has nothing to test, and the RAG
+    # tester would spend its full timeout discovering that.
+    completed, skipped = [], []
+    for r in ingestion_results:
+        if r.get("status") != "completed":
+            continue
+        if r.get("total_items", 0):
+            completed.append(r)
         else:
-            result["status"] = "error"
-            result["error"] = resp.get("error", resp.get("body", "unknown"))[:500]
-            print(f"    ERROR: {result['error'][:200]}")
+            print(f"  [{r['name']}] SKIP: ingestion reported 0 items")
+            skipped.append({
+                "name": r["name"],
+                "rag_target": r.get("rag_target", "standard"),
+                "status": "skipped",
+                "error": "ingestion reported 0 items",
+                "duration_s": 0,
+                "timestamp": datetime.now().isoformat(),
+            })
+    print(f"  Datasets ready for testing: {len(completed)}/{len(ingestion_results)}")
+    if not completed:
+        return skipped
+    print(f"  Concurrency: {INGEST_CONCURRENCY}")
 
-        test_results.append(result)
-        time.sleep(1)
+    test_results = [None] * len(completed)
+    workers = max(1, min(INGEST_CONCURRENCY, len(completed)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(test_rag_dataset, ds): idx
+                   for idx, ds in enumerate(completed)}
+        for future in as_completed(futures):
+            test_results[futures[future]] = future.result()
 
-    return test_results
+    return test_results + skipped
 
 
 # ============================================================
@@ -331,13 +548,17 @@ def test_orchestrator(ingestion_results):
     # Test a sample from each category
     categories = {}
     for r in ingestion_results:
-        if r.get("status") == "completed":
+        # Same data gate as phase 3 — empty datasets cannot exercise routing.
+        if r.get("status") == "completed" and r.get("total_items", 0):
             cat = r.get("rag_target", "standard")
             if cat not in categories:
                 categories[cat] = r["name"]
 
     print(f"  Testing {len(categories)} routing categories: {list(categories.keys())}")
 
+    # Deliberately serial — orchestrator runs fan out into sub-workflow
+    # executions that contend with each other under parallel load (the
+    # same reason eval runners pin orchestrator concurrency to 1).
     orch_results = []
     for cat, ds_name in categories.items():
         print(f"\n  Testing orchestrator routing for: {ds_name} (expected: {cat})")
@@ -350,9 +571,9 @@ def test_orchestrator(ingestion_results):
             "tenant_id": "benchmark"
         }
 
-        start_time = time.time()
+        start_time = time.monotonic()
         resp = webhook_request("benchmark-test-orchestrator", payload, timeout=180)
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
 
         result = {
             "name": ds_name,
@@ -361,19 +582,15 @@ def test_orchestrator(ingestion_results):
             "timestamp": datetime.now().isoformat()
         }
 
-        if resp.get("data"):
-            data = resp["data"]
-            result["status"] = "completed"
-            result["run_id"] = data.get("run_id", "")
+        data = _apply_webhook_outcome(result, resp)
+        if data is not None:
             result["routing_accuracy"] = data.get("aggregate_metrics", {}).get("routing_correctness", 0)
             print(f"    SUCCESS in {result['duration_s']}s")
         else:
-            result["status"] = "error"
-            result["error"] = resp.get("error", resp.get("body", "unknown"))[:500]
             print(f"    ERROR: {result['error'][:200]}")
+            time.sleep(2)
 
         orch_results.append(result)
-        time.sleep(1)
 
     return orch_results
 
@@ -391,58 +608,69 @@ def update_result_files(ingestion_results, test_results):
     ingest_lookup = {r["name"]: r for r in ingestion_results}
     test_lookup = {r["name"]: r for r in (test_results or [])}
 
-    updated_count = 0
-
-    # Map dataset names to their result files
-    result_files = {}
-    for f in os.listdir(RESULTS_DIR):
-        if f.startswith("results-") and f.endswith(".json"):
-            result_files[f] = os.path.join(RESULTS_DIR, f)
+    # One timestamp for the whole batch — formatting it per file is wasted
+    # work and makes the files written by one run look like separate runs.
+    now_iso = datetime.now().isoformat()
 
-    for filename, filepath in result_files.items():
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-        except Exception:
-            continue
+    updated_count = 0
 
-        ds_name = data.get("dataset_name", "")
-        if not ds_name:
+    # Map dataset names to their result files from the filename alone
+    # (results-<dataset>.json) in one scandir pass. Only files whose
+    # dataset actually has new data get opened — parsing all 17 JSON
+    # files just to read their dataset_name wasted most of the phase.
+    files_by_dataset = defaultdict(list)
+    for entry in os.scandir(RESULTS_DIR):
+        name = entry.name
+        if name.startswith("results-") and name.endswith(".json"):
+            files_by_dataset[name[len("results-"):-len(".json")]].append(entry.path)
+
+    touched = sorted(set(ingest_lookup) | set(test_lookup))
+    for ds_name in touched:
+        filepaths = files_by_dataset.get(ds_name, [])
+        if not filepaths:
             continue
+        for filepath in filepaths:
+            filename = os.path.basename(filepath)
+            try:
+                data = _load_json_file(filepath)
+            except Exception:
+                continue
 
-        ingest_info = ingest_lookup.get(ds_name)
-        test_info = test_lookup.get(ds_name)
-
-        if ingest_info:
-            data["data_verification"] = data.get("data_verification", {})
-            if ingest_info.get("status") == "completed":
-                data["data_verification"]["ingestion_status"] = "completed"
-                data["data_verification"]["ingestion_run_id"] = ingest_info.get("run_id", "")
-                data["data_verification"]["items_ingested"] = ingest_info.get("total_items", 0)
-                data["data_verification"]["ingested_at"] = ingest_info.get("timestamp", "")
-                data["data_verification"]["supabase_ready"] = True
-                data["data_verification"]["pinecone_ready"] = True
-                if ingest_info.get("rag_target") == "graph":
-                    data["data_verification"]["neo4j_ready"] = True
-            else:
-                data["data_verification"]["ingestion_status"] = "error"
-                data["data_verification"]["ingestion_error"] = ingest_info.get("error", "")
-
-        if test_info and test_info.get("status") == "completed":
-            data["data_verification"]["test_run_id"] = test_info.get("run_id", "")
-            data["data_verification"]["test_metrics"] = test_info.get("metrics", {})
+            _apply_result_update(data, ingest_lookup.get(ds_name), test_lookup.get(ds_name))
 
-        data["last_updated"] = datetime.now().isoformat()
+            data["last_updated"] = now_iso
 
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
-        updated_count += 1
-        print(f"  Updated: {filename}")
+            _dump_json_file(data, filepath)
+            updated_count += 1
+            print(f"  Updated: {filename}")
 
     print(f"\n  Total files updated: {updated_count}")
     return updated_count
 
 
+def _apply_result_update(data, ingest_info, test_info):
+    """Fold a dataset's ingestion/test outcome into its result-file dict."""
+    if ingest_info:
+        verification = data.setdefault("data_verification", {})
+        if ingest_info.get("status") == "completed":
+            verification["ingestion_status"] = "completed"
+            verification["ingestion_run_id"] = ingest_info.get("run_id", "")
+            verification["items_ingested"] = ingest_info.get("total_items", 0)
+            verification["ingested_at"] = ingest_info.get("timestamp", "")
+            verification["supabase_ready"] = True
+            verification["pinecone_ready"] = True
+            if ingest_info.get("rag_target") == "graph":
+                verification["neo4j_ready"] = True
+        else:
+            verification["ingestion_status"] = "error"
+            verification["ingestion_error"] = ingest_info.get("error", "")
+
+    if test_info and test_info.get("status") == "completed":
+        verification = data.setdefault("data_verification", {})
+        verification["test_run_id"] = test_info.get("run_id", "")
+        verification["test_metrics"] = test_info.get("metrics", {})
+
+
 # ============================================================
 # PHASE 6: Regenerate Master Dashboard
 # ============================================================
@@ -474,14 +702,20 @@ def regenerate_dashboard():
 # Main
 # ============================================================
 if __name__ == "__main__":
-    start_total = time.time()
+    start_total = time.monotonic()
+
+    # Fail fast — without a key every API call would retry 3x against a 401
+    # before the run dies ~dozens of requests later.
+    if not N8N_API_KEY:
+        print("ERROR: N8N_API_KEY is not set (see .env.local)")
+        sys.exit(1)
 
     print("=" * 70)
     print("RAG BENCHMARK — PUSH ALL DATASETS VIA BENCHMARK WORKFLOWS")
     print(f"Time: {datetime.now().isoformat()}")
     print(f"n8n Host: {N8N_HOST}")
-    print(f"Datasets: {len(ALL_DATASETS)}")
-    print(f"Total Q&A target: {sum(d['sample_size'] for d in ALL_DATASETS)}")
+    print(f"Datasets: {N_DATASETS}")
+    print(f"Total Q&A target: {TOTAL_TARGET_ITEMS}")
     print("=" * 70)
 
     all_results = {
@@ -517,7 +751,7 @@ if __name__ == "__main__":
     regenerate_dashboard()
 
     # Final summary
-    total_elapsed = time.time() - start_total
+    total_elapsed = time.monotonic() - start_total
     ingested_ok = [r for r in ingestion_results if r.get("status") == "completed"]
     ingested_fail = [r for r in ingestion_results if r.get("status") != "completed"]
     tested_ok = [r for r in test_results if r.get("status") == "completed"]
@@ -526,7 +760,7 @@ if __name__ == "__main__":
     print("FINAL SUMMARY")
     print("=" * 70)
     print(f"  Workflows deployed: {deployed_ok}/{len(WORKFLOW_FILES)}")
-    print(f"  Datasets ingested:  {len(ingested_ok)}/{len(ALL_DATASETS)}")
+    print(f"  Datasets ingested:  {len(ingested_ok)}/{N_DATASETS}")
     print(f"  RAG tests passed:   {len(tested_ok)}/{len(test_results)}")
     print(f"  Orchestrator tests: {len([r for r in orch_results if r.get('status') == 'completed'])}/{len(orch_results)}")
     print(f"  Total duration:     {round(total_elapsed, 1)}s")
@@ -556,6 +790,5 @@ if __name__ == "__main__":
     }
 
     output_file = os.path.join(REPO_ROOT, "push-all-results.json")
-    with open(output_file, "w") as f:
-        json.dump(all_results, f, indent=2)
+    _dump_json_file(all_results, output_file)
     print(f"\nFull results saved: {output_file}")
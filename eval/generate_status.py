@@ -112,7 +112,8 @@ def generate():
     avg_acc = round(sum(pipe_accs) / len(pipe_accs), 1) if pipe_accs else 0
     overall_met = avg_acc >= PHASE_1_OVERALL
 
-    all_met = all(p["met"] for p in pipelines.values()) and overall_met
+    # Check the cheap precomputed flag first so the generator can be skipped
+    all_met = overall_met and all(p["met"] for p in pipelines.values())
 
     # Compute blockers
     blockers = []
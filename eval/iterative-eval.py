@@ -36,6 +36,23 @@ import sys
 import time
 import threading
 from datetime import datetime
+
+# orjson serializes ~5x faster than stdlib json — stage reports carry the
+# full per-question results and grow to hundreds of KB. Optional.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj, path):
+    """Write an indented JSON report, via orjson when available."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
 
@@ -51,7 +68,6 @@ call_rag = run_eval_mod.call_rag
 extract_answer = run_eval_mod.extract_answer
 evaluate_answer = run_eval_mod.evaluate_answer
 extract_pipeline_details = run_eval_mod.extract_pipeline_details
-compute_f1 = run_eval_mod.compute_f1
 load_questions = run_eval_mod.load_questions
 RAG_ENDPOINTS = run_eval_mod.RAG_ENDPOINTS
 
@@ -269,30 +285,61 @@ def select_questions_for_stage(all_questions, pipeline, stage_num, n, previous_s
 # ============================================================
 # Pipeline Runner
 # ============================================================
+def _call_and_score(pipeline, endpoint, q):
+    """Call one question's endpoint and score the answer (thread-safe)."""
+    rag_timeout = 120 if pipeline == "orchestrator" else 60
+    resp = call_rag(endpoint, q["question"], timeout=rag_timeout)
+
+    if resp["error"]:
+        answer = ""
+        evaluation = {"correct": False, "method": "NO_ANSWER", "f1": 0.0, "detail": resp["error"]}
+        pipeline_details = {}
+    else:
+        answer = extract_answer(resp["data"])
+        evaluation = evaluate_answer(answer, q["expected"])
+        pipeline_details = extract_pipeline_details(resp["data"], pipeline)
+
+    return resp, answer, evaluation, pipeline_details
+
+
 def run_pipeline_stage(pipeline, questions, stage_name):
     """Run a single pipeline stage and return results."""
     endpoint = RAG_ENDPOINTS[pipeline]
     results = []
     start = time.time()
 
-    tprint(f"\n  [{pipeline.upper()}] {stage_name}: Testing {len(questions)} questions...")
+    # Per-question concurrency (--concurrency). Default 1 = serial with
+    # adaptive pacing as before; above 1, up to N requests stay in flight
+    # and results are still reported in question order. The orchestrator
+    # is always serial — its sub-workflows contend with each other.
+    concurrency = getattr(run_pipeline_stage, "_concurrency", 1)
+    if pipeline == "orchestrator":
+        concurrency = 1
+
+    tprint(f"\n  [{pipeline.upper()}] {stage_name}: Testing {len(questions)} questions..."
+           + (f" ({concurrency} in flight)" if concurrency > 1 else ""))
+
+    if concurrency > 1:
+        gathered = [None] * len(questions)
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(questions))) as executor:
+            futures = {executor.submit(_call_and_score, pipeline, endpoint, q): idx
+                       for idx, q in enumerate(questions)}
+            for future in as_completed(futures):
+                gathered[futures[future]] = future.result()
+    else:
+        gathered = None
 
     for i, q in enumerate(questions):
         qid = q["id"]
-        rag_timeout = 120 if pipeline == "orchestrator" else 60
-        resp = call_rag(endpoint, q["question"], timeout=rag_timeout)
-
-        if resp["error"]:
-            answer = ""
-            evaluation = {"correct": False, "method": "NO_ANSWER", "f1": 0.0, "detail": resp["error"]}
-            pipeline_details = {}
+        if gathered is not None:
+            resp, answer, evaluation, pipeline_details = gathered[i]
         else:
-            answer = extract_answer(resp["data"])
-            evaluation = evaluate_answer(answer, q["expected"])
-            pipeline_details = extract_pipeline_details(resp["data"], pipeline)
+            resp, answer, evaluation, pipeline_details = _call_and_score(pipeline, endpoint, q)
 
         is_correct = evaluation.get("correct", False)
-        f1_val = evaluation.get("f1", compute_f1(answer, q["expected"]))
+        # evaluate_answer always returns f1; the old .get() fallback eagerly
+        # re-scored every answer just to discard the result.
+        f1_val = evaluation.get("f1", 0.0)
 
         error_type = None
         if resp["error"]:
@@ -362,7 +409,8 @@ def run_pipeline_stage(pipeline, questions, stage_name):
 
         # Adaptive rate-limit: only sleep on rate-limit errors, not between all questions
         # For orchestrator: small delay to avoid cascading sub-workflow contention
-        if i < len(questions) - 1:
+        # (skipped in concurrent mode — responses already arrived)
+        if gathered is None and i < len(questions) - 1:
             if error_type in ("RATE_LIMIT", "CREDITS_EXHAUSTED"):
                 time.sleep(3)  # Back off only when rate-limited
             elif pipeline == "orchestrator":
@@ -561,8 +609,15 @@ def main():
                         help="Run pipelines in parallel within each stage")
     parser.add_argument("--no-analysis", action="store_true",
                         help="Skip post-stage node-by-node analysis")
+    parser.add_argument("--concurrency", type=int,
+                        default=int(os.environ.get("EVAL_CONCURRENCY", "1")),
+                        help="Questions in flight per pipeline (env: EVAL_CONCURRENCY). "
+                             "Default 1 (serial). Orchestrator always stays at 1.")
     args = parser.parse_args()
 
+    if args.concurrency > 1:
+        run_pipeline_stage._concurrency = args.concurrency
+
     start_time = datetime.now()
     pipelines = [p.strip() for p in args.pipelines.split(",")]
     start_stage = args.stage - 1  # 0-indexed
@@ -640,48 +695,56 @@ def main():
         # Select questions and run
         stage_results = {}
 
+        def _stage_questions(pipe):
+            """Select this stage's questions for a pipeline, or None if empty."""
+            pipe_qs = all_questions.get(pipe, [])
+            if not pipe_qs:
+                tprint(f"  [{pipe.upper()}] No questions available, skipping")
+                return None
+            prev_results = None
+            if stage_idx > 0 and all_stage_results[pipe]:
+                prev_results = all_stage_results[pipe][-1]["results"]
+            return select_questions_for_stage(
+                pipe_qs, pipe, stage_idx, n_questions, prev_results
+            )
+
         if args.parallel and len(active_pipelines) > 1:
-            # Parallel execution
-            with ThreadPoolExecutor(max_workers=len(active_pipelines)) as executor:
-                futures = {}
-                for pipe in active_pipelines:
-                    pipe_qs = all_questions.get(pipe, [])
-                    if not pipe_qs:
-                        tprint(f"  [{pipe.upper()}] No questions available, skipping")
-                        continue
-
-                    prev_results = None
-                    if stage_idx > 0 and all_stage_results[pipe]:
-                        prev_results = all_stage_results[pipe][-1]["results"]
-
-                    selected = select_questions_for_stage(
-                        pipe_qs, pipe, stage_idx, n_questions, prev_results
-                    )
-                    future = executor.submit(run_pipeline_stage, pipe, selected, stage_name)
-                    futures[future] = pipe
-
-                for future in as_completed(futures):
-                    pipe = futures[future]
-                    try:
-                        result = future.result()
-                        stage_results[pipe] = result
-                    except Exception as e:
-                        tprint(f"  [{pipe.upper()}] FAILED: {e}")
+            # Parallel execution — but the orchestrator waits for the fan-out
+            # to drain (same split as run-eval-parallel): its runs trigger
+            # sub-workflow executions that contend with the other pipelines'
+            # load on n8n.
+            parallel_pipes = [p for p in active_pipelines if p != "orchestrator"]
+            serial_pipes = [p for p in active_pipelines if p == "orchestrator"]
+
+            if parallel_pipes:
+                with ThreadPoolExecutor(max_workers=len(parallel_pipes)) as executor:
+                    futures = {}
+                    for pipe in parallel_pipes:
+                        selected = _stage_questions(pipe)
+                        if selected is None:
+                            continue
+                        future = executor.submit(run_pipeline_stage, pipe, selected, stage_name)
+                        futures[future] = pipe
+
+                    for future in as_completed(futures):
+                        pipe = futures[future]
+                        try:
+                            result = future.result()
+                            stage_results[pipe] = result
+                        except Exception as e:
+                            tprint(f"  [{pipe.upper()}] FAILED: {e}")
+
+            for pipe in serial_pipes:
+                selected = _stage_questions(pipe)
+                if selected is None:
+                    continue
+                stage_results[pipe] = run_pipeline_stage(pipe, selected, stage_name)
         else:
             # Sequential execution
             for pipe in active_pipelines:
-                pipe_qs = all_questions.get(pipe, [])
-                if not pipe_qs:
-                    tprint(f"  [{pipe.upper()}] No questions available, skipping")
+                selected = _stage_questions(pipe)
+                if selected is None:
                     continue
-
-                prev_results = None
-                if stage_idx > 0 and all_stage_results[pipe]:
-                    prev_results = all_stage_results[pipe][-1]["results"]
-
-                selected = select_questions_for_stage(
-                    pipe_qs, pipe, stage_idx, n_questions, prev_results
-                )
                 result = run_pipeline_stage(pipe, selected, stage_name)
                 stage_results[pipe] = result
 
@@ -756,8 +819,7 @@ def main():
     # Save report
     ts = datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%S")
     report_path = os.path.join(RESULTS_DIR, f"iterative-{ts}.json")
-    with open(report_path, "w") as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    _dump_json(report, report_path)
 
     # Save stage data to a format the dashboard can consume
     stage_data_path = os.path.join(RESULTS_DIR, f"stages-{ts}.json")
@@ -781,13 +843,11 @@ def main():
                 "diagnostics": s.get("diagnostics"),
             } for s in stages],
         }
-    with open(stage_data_path, "w") as f:
-        json.dump(stage_data, f, indent=2, ensure_ascii=False)
+    _dump_json(stage_data, stage_data_path)
 
     # Also save the latest stage data to a well-known location
     latest_path = os.path.join(RESULTS_DIR, "latest-stages.json")
-    with open(latest_path, "w") as f:
-        json.dump(stage_data, f, indent=2, ensure_ascii=False)
+    _dump_json(stage_data, latest_path)
 
     # Print final summary
     elapsed = int((datetime.now() - start_time).total_seconds())
@@ -25,14 +25,15 @@ Usage:
   python eval/node-analyzer.py --execution-id 12345 --verbose
 """
 
+import heapq
 import json
+import http.client
 import os
-import sys
+import threading
 import time
-import re
 from datetime import datetime, timedelta
-from collections import defaultdict, OrderedDict
-from urllib import request, error
+from collections import defaultdict
+from urllib.parse import urlsplit
 
 EVAL_DIR = os.path.dirname(os.path.abspath(__file__))
 REPO_ROOT = os.path.dirname(EVAL_DIR)
@@ -49,6 +50,9 @@ WORKFLOW_IDS = {
     "quantitative": "e465W7V9Q8uK6zJE",
     "orchestrator": "aGsYnJY9nNCaTM82",
 }
+# Reverse lookup, built once — fetch_execution_by_id used to invert the
+# dict on every call.
+PIPELINE_BY_WORKFLOW_ID = {v: k for k, v in WORKFLOW_IDS.items()}
 
 # ============================================================
 # Thresholds for automated issue detection
@@ -89,20 +93,59 @@ def _is_node_type(name, keywords):
 # ============================================================
 # n8n API — Rich Execution Fetcher
 # ============================================================
+# Request headers are identical for every call — build them once.
+_API_HEADERS = {"Accept": "application/json", "Content-Type": "application/json"}
+if N8N_API_KEY:
+    _API_HEADERS["X-N8N-API-KEY"] = N8N_API_KEY
+
+# Per-thread keep-alive connection, keyed by (scheme, netloc). A --last 10
+# analysis issues a dozen API calls to the same host; reusing one
+# http.client connection drops the TCP handshake from every call but the
+# first (same pattern as run-eval's pooled POST).
+_conn_local = threading.local()
+
+
+def _pooled_get(url, timeout):
+    """GET over a per-thread keep-alive connection.
+    Returns (status, raw_bytes). Reconnects once if the pooled socket
+    went stale between calls."""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    conns = getattr(_conn_local, "conns", None)
+    if conns is None:
+        conns = _conn_local.conns = {}
+
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    for attempt in range(2):
+        conn = conns.get(key)
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(parts.netloc, timeout=timeout)
+            conns[key] = conn
+        elif conn.timeout != timeout:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        try:
+            conn.request("GET", path, headers=_API_HEADERS)
+            resp = conn.getresponse()
+            return resp.status, resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conns.pop(key, None)
+            if attempt == 1:
+                raise
+
+
 def n8n_api(path, timeout=30):
     """Call n8n REST API."""
     url = f"{N8N_HOST}/api/v1{path}"
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    if N8N_API_KEY:
-        headers["X-N8N-API-KEY"] = N8N_API_KEY
-    req = request.Request(url, headers=headers)
     try:
-        with request.urlopen(req, timeout=timeout) as resp:
-            return json.loads(resp.read())
-    except error.HTTPError as e:
-        body = e.read().decode()[:200] if e.fp else ""
-        print(f"  [node-analyzer] n8n API error: {e.code} — {body}")
-        return None
+        status, raw = _pooled_get(url, timeout)
+        if status >= 400:
+            print(f"  [node-analyzer] n8n API error: {status} — {raw[:200].decode('utf-8', 'replace')}")
+            return None
+        return json.loads(raw)
     except Exception as e:
         print(f"  [node-analyzer] n8n API error: {e}")
         return None
@@ -135,7 +178,7 @@ def fetch_execution_by_id(exec_id):
         return None
     # Determine pipeline from workflow ID
     wf_id = result.get("workflowId", "")
-    pipeline = {v: k for k, v in WORKFLOW_IDS.items()}.get(wf_id, "unknown")
+    pipeline = PIPELINE_BY_WORKFLOW_ID.get(wf_id, "unknown")
     return parse_rich_execution(result, pipeline)
 
 
@@ -840,7 +883,14 @@ def analyze_cross_execution_patterns(executions):
     # Latency bottlenecks
     for name, latencies in patterns["latency_distribution"].items():
         avg = sum(latencies) / len(latencies) if latencies else 0
-        p95 = sorted(latencies)[int(len(latencies) * 0.95)] if len(latencies) > 1 else (latencies[0] if latencies else 0)
+        if len(latencies) > 1:
+            # Partial selection: only the top 5% tail is needed for p95,
+            # so O(N log k) heap selection beats fully sorting each node's
+            # latency list on large execution batches.
+            k = len(latencies) - int(len(latencies) * 0.95)
+            p95 = heapq.nlargest(k, latencies)[-1]
+        else:
+            p95 = latencies[0] if latencies else 0
         if avg > THRESHOLDS["node_slow_ms"]:
             result["latency_bottlenecks"].append({
                 "node": name,
@@ -1304,8 +1354,14 @@ def _deduplicate_issues(issues):
     return sorted(seen.values(), key=lambda x: _severity_rank(x["severity"]), reverse=True)
 
 
+_SEVERITY_RANK = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+
+
 def _severity_rank(s):
-    return {"critical": 4, "high": 3, "medium": 2, "low": 1}.get(s, 0)
+    # Module-level table — this runs once per issue during dedupe and again
+    # per comparison while sorting, so the dict literal was rebuilt O(n log n)
+    # times per report.
+    return _SEVERITY_RANK.get(s, 0)
 
 
 def _aggregate_timelines(timelines):
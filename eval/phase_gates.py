@@ -20,6 +20,7 @@ Usage:
 import json
 import os
 import sys
+from collections import defaultdict
 from datetime import datetime
 
 EVAL_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -114,23 +115,23 @@ def get_pipeline_accuracy(data):
     # Also check question_registry for computed accuracy
     registry = data.get("question_registry", {})
     if registry:
-        pipe_correct = {}
-        pipe_total = {}
-        for qid, qdata in registry.items():
+        # Single pass: only questions with both runs and a pipeline ever
+        # reach the counters, so the rate loop below never sees a
+        # zero-total pipeline and needs no per-row .get() fallbacks.
+        pipe_correct = defaultdict(int)
+        pipe_total = defaultdict(int)
+        for qdata in registry.values():
             runs = qdata.get("runs", [])
-            if not runs:
-                continue
-            last_run = runs[-1]
             pipe = qdata.get("rag_type", "")
-            if not pipe:
+            if not runs or not pipe:
                 continue
-            pipe_total[pipe] = pipe_total.get(pipe, 0) + 1
-            if last_run.get("correct"):
-                pipe_correct[pipe] = pipe_correct.get(pipe, 0) + 1
-        for pipe in pipe_total:
-            computed = round(pipe_correct.get(pipe, 0) / pipe_total[pipe] * 100, 1)
+            pipe_total[pipe] += 1
+            if runs[-1].get("correct"):
+                pipe_correct[pipe] += 1
+        for pipe, total in pipe_total.items():
+            computed = round(pipe_correct[pipe] / total * 100, 1)
             # Use computed if no trend data, or if more recent
-            if pipe not in accuracies or pipe_total[pipe] > 10:
+            if pipe not in accuracies or total > 10:
                 accuracies[pipe] = computed
     return accuracies
 
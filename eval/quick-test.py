@@ -13,18 +13,20 @@ Usage:
 
 import json
 import os
+import re
 import sys
 import time
-from datetime import datetime
-from urllib import request, error
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from importlib.machinery import SourceFileLoader
 
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 EVAL_DIR = os.path.dirname(os.path.abspath(__file__))
 N8N_HOST = os.environ.get("N8N_HOST", "http://34.136.180.66:5678")
 
-# Load writer
+# Load writer + shared HTTP layer (keep-alive connection pool)
 writer = SourceFileLoader("w", os.path.join(EVAL_DIR, "live-writer.py")).load_module()
+run_eval_mod = SourceFileLoader("run_eval", os.path.join(EVAL_DIR, "run-eval.py")).load_module()
 
 RAG_ENDPOINTS = {
     "standard":     f"{N8N_HOST}/webhook/rag-multi-index-v3",
@@ -66,50 +68,81 @@ SMOKE_QUESTIONS = {
 }
 
 
+# Compiled once — normalize_for_match runs twice per question
+_NUM_COMMA_RE = re.compile(r'(\d),(\d)')
+_CURRENCY_TABLE = str.maketrans('', '', '$%')
+
+
+@lru_cache(maxsize=256)
 def normalize_for_match(text):
-    """Normalize text for fuzzy matching — strip formatting from numbers etc."""
-    import re
+    """Normalize text for fuzzy matching — strip formatting from numbers etc.
+    Cached — the expected side is a fixed set of smoke-test strings."""
     # Remove commas from numbers (6,745 → 6745), dollar signs, percent signs
-    normalized = re.sub(r'(\d),(\d)', r'\1\2', text)
-    normalized = normalized.replace('$', '').replace('%', '')
-    return normalized.lower()
+    return _NUM_COMMA_RE.sub(r'\1\2', text).translate(_CURRENCY_TABLE).lower()
+
+
+# Warm the cache for the static expected side now (same pattern as
+# run-eval's load-time warmup) — only live answers get normalized in the
+# per-question loop.
+for _qs in SMOKE_QUESTIONS.values():
+    for _q in _qs:
+        if _q["expected_contains"]:
+            normalize_for_match(_q["expected_contains"])
+
+
+# Payload template is constant apart from the query — built once here
+# instead of re-allocated per call.
+_BASE_PAYLOAD = {
+    "tenant_id": "benchmark",
+    "top_k": 10,
+    "include_sources": True,
+    "benchmark_mode": True,
+}
 
 
 def call_endpoint(endpoint, query, timeout=60):
-    """Call a RAG endpoint and return response info."""
-    payload = json.dumps({
-        "query": query,
-        "tenant_id": "benchmark",
-        "top_k": 10,
-        "include_sources": True,
-        "benchmark_mode": True,
-    }).encode()
-    headers = {"Content-Type": "application/json"}
+    """Call a RAG endpoint and return response info.
+
+    Requests go through run-eval's per-thread keep-alive pool, so a 5-question
+    smoke run reuses one TCP connection per endpoint instead of paying a
+    handshake per call. Safe to run from worker threads.
+    """
+    payload = json.dumps({**_BASE_PAYLOAD, "query": query}).encode()
 
     try:
-        req = request.Request(endpoint, data=payload, headers=headers, method="POST")
-        start = time.time()
-        with request.urlopen(req, timeout=timeout) as resp:
-            raw = resp.read().decode()
-            latency = int((time.time() - start) * 1000)
-            if raw and raw.strip():
-                data = json.loads(raw)
-                if isinstance(data, list):
-                    data = data[0] if data else {}
-                # Extract answer
-                answer = ""
-                for key in ["response", "answer", "result", "interpretation", "final_response"]:
-                    if key in data and data[key]:
-                        answer = str(data[key])
-                        break
-                return {"status": "ok", "latency_ms": latency, "answer": answer, "error": None}
-            return {"status": "empty", "latency_ms": latency, "answer": "", "error": "Empty response"}
+        start = time.monotonic()
+        status, raw_bytes = run_eval_mod._pooled_post(endpoint, payload, timeout)
+        latency = int((time.monotonic() - start) * 1000)
+        if status >= 400:
+            error = f"HTTP Error {status}: {raw_bytes[:150].decode('utf-8', 'replace')}"
+            return {"status": "error", "latency_ms": latency, "answer": "", "error": error[:200]}
+        if raw_bytes and raw_bytes.strip():
+            # Parse straight from bytes — orjson (via run-eval's shim) takes
+            # bytes natively, so no intermediate str copy of the response.
+            data = run_eval_mod._json_loads(raw_bytes)
+            if isinstance(data, list):
+                data = data[0] if data else {}
+            # Extract answer — skip the str() copy for the common case where
+            # the field already is one
+            answer = ""
+            for key in ["response", "answer", "result", "interpretation", "final_response"]:
+                value = data.get(key)
+                if value:
+                    answer = value if isinstance(value, str) else str(value)
+                    break
+            return {"status": "ok", "latency_ms": latency, "answer": answer, "error": None}
+        return {"status": "empty", "latency_ms": latency, "answer": "", "error": "Empty response"}
     except Exception as e:
         return {"status": "error", "latency_ms": 0, "answer": "", "error": str(e)[:200]}
 
 
-def run_quick_tests(pipelines, max_questions=3, trigger="manual"):
-    """Run quick smoke tests for specified pipelines."""
+def run_quick_tests(pipelines, max_questions=3, trigger="manual", concurrency=1):
+    """Run quick smoke tests for specified pipelines.
+
+    Pipelines always run sequentially (n8n overloads otherwise); with
+    concurrency > 1 the questions *within* a pipeline overlap their webhook
+    waits in a thread pool, except for the orchestrator whose sub-workflows
+    contend under parallel load."""
     results = {}
 
     for pipe in pipelines:
@@ -118,13 +151,27 @@ def run_quick_tests(pipelines, max_questions=3, trigger="manual"):
         if not endpoint or not questions:
             continue
 
-        print(f"\n  Quick test: {pipe.upper()} ({len(questions)} questions)")
+        # Use generous timeouts — LLM calls via free models can be slow
+        pipe_timeout = 300 if pipe == "orchestrator" else 90
+        pipe_concurrency = 1 if pipe == "orchestrator" else min(concurrency, len(questions))
+
+        print(f"\n  Quick test: {pipe.upper()} ({len(questions)} questions"
+              + (f", {pipe_concurrency} in flight" if pipe_concurrency > 1 else "") + ")")
         pipe_results = []
 
+        if pipe_concurrency > 1:
+            with ThreadPoolExecutor(max_workers=pipe_concurrency) as executor:
+                responses = list(executor.map(
+                    lambda q: call_endpoint(endpoint, q["query"], timeout=pipe_timeout),
+                    questions))
+        else:
+            responses = None
+
         for i, q in enumerate(questions):
-            # Use generous timeouts — LLM calls via free models can be slow
-            pipe_timeout = 300 if pipe == "orchestrator" else 90
-            resp = call_endpoint(endpoint, q["query"], timeout=pipe_timeout)
+            if responses is not None:
+                resp = responses[i]
+            else:
+                resp = call_endpoint(endpoint, q["query"], timeout=pipe_timeout)
             expected = q.get("expected_contains", "")
             passed = False
 
@@ -173,6 +220,10 @@ def main():
     parser.add_argument("--pipelines", type=str, default="standard,graph,quantitative,orchestrator")
     parser.add_argument("--questions", type=int, default=3)
     parser.add_argument("--trigger", type=str, default="manual")
+    parser.add_argument("--concurrency", type=int,
+                        default=int(os.environ.get("EVAL_CONCURRENCY", "1")),
+                        help="Questions in flight per pipeline, env: EVAL_CONCURRENCY "
+                             "(orchestrator stays serial)")
     args = parser.parse_args()
 
     pipelines = [p.strip() for p in args.pipelines.split(",")]
@@ -182,7 +233,8 @@ def main():
     print(f"  Questions per pipeline: {args.questions}")
     print("=" * 50)
 
-    results = run_quick_tests(pipelines, max_questions=args.questions, trigger=args.trigger)
+    results = run_quick_tests(pipelines, max_questions=args.questions, trigger=args.trigger,
+                              concurrency=args.concurrency)
 
     print("\n" + "=" * 50)
     print("  SUMMARY")
@@ -25,6 +25,10 @@ import sys
 import time
 import threading
 from datetime import datetime
+# Threads, not asyncio: the useful parallelism here tops out at a handful
+# of in-flight webhook calls (n8n 503s under more), which a small
+# ThreadPoolExecutor covers without an async HTTP dependency — and it
+# keeps run-eval's blocking keep-alive connection pool reusable as-is.
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import from the existing run-eval.py
@@ -41,7 +45,6 @@ call_rag = run_eval_mod.call_rag
 extract_answer = run_eval_mod.extract_answer
 evaluate_answer = run_eval_mod.evaluate_answer
 extract_pipeline_details = run_eval_mod.extract_pipeline_details
-compute_f1 = run_eval_mod.compute_f1
 load_questions = run_eval_mod.load_questions
 load_tested_ids_by_type = run_eval_mod.load_tested_ids_by_type
 save_tested_ids = run_eval_mod.save_tested_ids
@@ -109,23 +112,64 @@ def save_pipeline_results(rag_type, results, label=""):
     ts = datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%S")
     filename = f"{rag_type}-{ts}.json"
     filepath = os.path.join(PIPELINE_RESULTS_DIR, filename)
+    # One pass over results for all aggregates (was four comprehensions)
+    correct = errors = latency_total = 0
+    for r in results:
+        if r.get("correct"):
+            correct += 1
+        if r.get("error"):
+            errors += 1
+        latency_total += r.get("latency_ms", 0)
+
     snapshot = {
         "pipeline": rag_type,
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "label": label,
         "total_tested": len(results),
-        "correct": sum(1 for r in results if r.get("correct")),
-        "errors": sum(1 for r in results if r.get("error")),
-        "accuracy_pct": round(sum(1 for r in results if r.get("correct")) / len(results) * 100, 1) if results else 0,
-        "avg_latency_ms": int(sum(r.get("latency_ms", 0) for r in results) / len(results)) if results else 0,
+        "correct": correct,
+        "errors": errors,
+        "accuracy_pct": round(correct / len(results) * 100, 1) if results else 0,
+        "avg_latency_ms": int(latency_total / len(results)) if results else 0,
         "results": results,
     }
-    with open(filepath, "w") as f:
+    # Atomic write — a crash mid-dump must not leave a truncated snapshot
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
     tprint(f"  [{rag_type.upper()}] Results saved: {filepath}")
     return filepath
 
 
+def _call_and_score(rag_type, endpoint, q):
+    """Call one question's endpoint and score the answer.
+    Safe to run in a worker thread — no shared state is touched."""
+    rag_timeout = 300 if rag_type == "orchestrator" else 90
+    resp = call_rag(endpoint, q["question"], timeout=rag_timeout)
+
+    if resp["error"]:
+        answer = ""
+        evaluation = {"correct": False, "method": "NO_ANSWER", "f1": 0.0,
+                      "detail": resp["error"]}
+        pipeline_details = {}
+    else:
+        answer = extract_answer(resp["data"])
+        evaluation = evaluate_answer(answer, q["expected"])
+        pipeline_details = extract_pipeline_details(resp["data"], rag_type)
+
+    # Everything downstream (prints, record_question, record_execution,
+    # per-question snapshot) works from the extracted fields — drop the
+    # full parsed body so concurrent runs don't hold every response in
+    # memory for the whole pipeline, and cap pathological answers.
+    resp["data"] = None
+    if len(answer) > 2000:
+        answer = answer[:2000]
+
+    return resp, answer, evaluation, pipeline_details
+
+
 def run_pipeline(rag_type, questions, tested_ids_by_type, label=""):
     """Run a single pipeline's evaluation. Designed to run in a thread.
     Returns (rag_type, totals_dict, per_question_results)."""
@@ -137,29 +181,51 @@ def run_pipeline(rag_type, questions, tested_ids_by_type, label=""):
         tprint(f"\n  [{rag_type.upper()}] SKIPPED (all {len(questions)} already tested)")
         return rag_type, {"tested": 0, "correct": 0, "errors": 0}, []
 
+    # Per-question concurrency within a pipeline (--concurrency). Default 1 =
+    # serial with adaptive pacing, as before. Above 1, the calls are I/O-bound
+    # waits on n8n, so overlapping N requests divides wall time by ~N; pacing
+    # sleeps are dropped and the worker bound is the only throttle.
+    concurrency = getattr(run_pipeline, '_concurrency', 1)
+    if rag_type == "orchestrator":
+        concurrency = 1  # sub-workflow contention — never parallelize
+
     tprint(f"\n  [{rag_type.upper()}] Starting {len(untested)} questions "
-           f"(skipping {len(already_tested)} already tested)")
+           f"(skipping {len(already_tested)} already tested"
+           + (f", {concurrency} in flight" if concurrency > 1 else "") + ")")
 
     totals = {"tested": 0, "correct": 0, "errors": 0}
     per_question_results = []
+    adaptive_delay = 0.0
+
+    # Append-only NDJSON shadow of the per-question records, written as
+    # results arrive. The end-of-run JSON snapshot stays the canonical
+    # artifact; this file exists so a crash or kill mid-pipeline leaves
+    # the completed questions on disk instead of losing the whole run.
+    # Removed once the snapshot is saved.
+    progress_path = os.path.join(PIPELINE_RESULTS_DIR, f"{rag_type}-inprogress.ndjson")
+    progress_fp = open(progress_path, "a", buffering=1)
+
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(_call_and_score, rag_type, endpoint, q): q
+                       for q in untested}
+            outcomes = [(futures[f], f.result()) for f in as_completed(futures)]
+    else:
+        outcomes = None
 
     for i, q in enumerate(untested):
         qid = q["id"]
-        rag_timeout = 300 if rag_type == "orchestrator" else 90
-        resp = call_rag(endpoint, q["question"], timeout=rag_timeout)
-
-        if resp["error"]:
-            answer = ""
-            evaluation = {"correct": False, "method": "NO_ANSWER", "f1": 0.0,
-                          "detail": resp["error"]}
-            pipeline_details = {}
+        if outcomes is not None:
+            q, (resp, answer, evaluation, pipeline_details) = outcomes[i]
+            qid = q["id"]
         else:
-            answer = extract_answer(resp["data"])
-            evaluation = evaluate_answer(answer, q["expected"])
-            pipeline_details = extract_pipeline_details(resp["data"], rag_type)
+            dispatch_t = time.monotonic()
+            resp, answer, evaluation, pipeline_details = _call_and_score(rag_type, endpoint, q)
 
         is_correct = evaluation.get("correct", False)
-        f1_val = evaluation.get("f1", compute_f1(answer, q["expected"]))
+        # evaluate_answer always returns f1; the old .get() fallback eagerly
+        # re-scored every answer just to discard the result.
+        f1_val = evaluation.get("f1", 0.0)
         has_error = resp["error"] is not None
 
         # Thread-safe print
@@ -213,18 +279,36 @@ def run_pipeline(rag_type, questions, tested_ids_by_type, label=""):
         if has_error:
             totals["errors"] += 1
 
-        # Adaptive rate-limit: only delay on rate-limit errors or for orchestrator spacing
-        if i < len(untested) - 1:
+        # AIMD pacing: the delay grows only when the server signals pressure
+        # (429/503/rate-limit) and decays back toward zero on success, so the
+        # common no-rate-limit path runs with no idle time at all. Not needed
+        # in concurrent mode — responses already arrived.
+        if outcomes is None and i < len(untested) - 1:
             custom_delay = getattr(run_pipeline, '_delay', None)
+            rate_limited = has_error and resp["error"] and (
+                "429" in resp["error"] or "503" in resp["error"]
+                or "rate" in resp["error"].lower() or "credit" in resp["error"].lower())
+            if rate_limited:
+                adaptive_delay = min(adaptive_delay * 2 + 0.1, 5.0)
+            else:
+                adaptive_delay *= 0.9
+                if adaptive_delay < 0.05:
+                    adaptive_delay = 0.0
             if custom_delay is not None:
-                time.sleep(custom_delay)
-            elif has_error and resp["error"] and ("429" in resp["error"] or "rate" in resp["error"].lower() or "credit" in resp["error"].lower()):
-                time.sleep(3)  # Back off on rate limit
+                pace = custom_delay
             elif rag_type == "orchestrator":
-                time.sleep(1)  # Minimal spacing for sub-workflow contention
+                pace = max(1.0, adaptive_delay)  # Minimal spacing for sub-workflow contention
+            else:
+                pace = adaptive_delay
+            # Pace from dispatch, not from completion: a webhook that already
+            # took >= pace seconds owes no extra sleep, so --delay sets a
+            # request *interval* rather than adding dead time to every call.
+            sleep_for = pace - (time.monotonic() - dispatch_t)
+            if sleep_for > 0:
+                time.sleep(sleep_for)
 
         # Per-question result for pipeline snapshot
-        per_question_results.append({
+        record = {
             "id": qid,
             "question": q["question"][:200],
             "expected": q["expected"][:200],
@@ -234,11 +318,19 @@ def run_pipeline(rag_type, questions, tested_ids_by_type, label=""):
             "latency_ms": resp["latency_ms"],
             "method": evaluation.get("method", ""),
             "error": resp["error"][:200] if resp["error"] else None,
-        })
+        }
+        per_question_results.append(record)
+        progress_fp.write(json.dumps(record, ensure_ascii=False) + "\n")
 
-    # Save per-pipeline results snapshot
+    # Save per-pipeline results snapshot; once it exists the NDJSON
+    # shadow is redundant.
+    progress_fp.close()
     if per_question_results:
         save_pipeline_results(rag_type, per_question_results, label=label)
+    try:
+        os.remove(progress_path)
+    except OSError:
+        pass
 
     # Save dedup after pipeline completes (thread-safe)
     with _dedup_lock:
@@ -276,11 +368,18 @@ def main():
                         help="Delay (seconds) between questions. Default: 2s (5s for orchestrator). Use 10+ for free models.")
     parser.add_argument("--workers", type=int, default=None,
                         help="Max parallel workers. Default: number of pipeline types. Use 1 for sequential.")
+    parser.add_argument("--concurrency", type=int,
+                        default=int(os.environ.get("EVAL_CONCURRENCY", "1")),
+                        help="Questions in flight per pipeline (env: EVAL_CONCURRENCY). "
+                             "Default 1 (serial). Higher values drop pacing sleeps; "
+                             "orchestrator always stays at 1.")
     args = parser.parse_args()
 
-    # Pass delay to run_pipeline via function attribute
+    # Pass delay/concurrency to run_pipeline via function attributes
     if args.delay is not None:
         run_pipeline._delay = args.delay
+    if args.concurrency > 1:
+        run_pipeline._concurrency = args.concurrency
 
     # Phase gate enforcement
     if not args.force and not check_phase_gate(args.dataset):
@@ -331,6 +430,21 @@ def main():
         elif args.max:
             questions[t] = questions[t][:args.max]
 
+    # In concurrent mode, order each pipeline's questions by length bucket
+    # (short FinQA prompts vs long multi-hop contexts) so in-flight requests
+    # have similar cost — a straggling long question no longer holds open a
+    # slot next to a burst of short ones. Selection (--max) happens above,
+    # so only dispatch order changes.
+    if args.concurrency > 1:
+        buckets = (16, 32, 64, 128, 256, 512, 10**6)
+
+        def length_bucket(q):
+            tok_len = len(q["question"].split()) + len(str(q.get("expected", "")).split())
+            return next(b for b in buckets if tok_len <= b)
+
+        for t in questions:
+            questions[t] = sorted(questions[t], key=length_bucket)
+
     # Load dedup
     if args.reset:
         tested_ids = {t: set() for t in ["standard", "graph", "quantitative", "orchestrator"]}
@@ -1,9 +1,25 @@
+import http.client
 import json
 import os
+import re
 import sys
+import threading
+import time
+from functools import lru_cache
 from urllib import request, error
-from datetime import datetime
-from collections import defaultdict
+from urllib.parse import urlsplit
+from collections import Counter, defaultdict
+
+# orjson parses/serializes ~3-5x faster than stdlib json, which matters for
+# large RAG response bodies in the per-question loop. Optional — fall back
+# to stdlib when it isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps_bytes = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps_bytes = lambda obj: json.dumps(obj).encode('utf-8')
 
 # --- Constants ---
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -21,28 +37,102 @@ RAG_ENDPOINTS = {
 
 # --- Functions ---
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Per-thread keep-alive connections, keyed by (scheme, host, timeout).
+# urllib opens a fresh TCP connection per request; reusing one
+# http.client connection per thread drops the per-question handshake.
+_conn_local = threading.local()
+
+
+def _pooled_post(url, body, timeout):
+    """POST over a per-thread keep-alive connection.
+    Returns (status, raw_bytes). Reconnects once if the pooled socket
+    went stale (server closed it between questions)."""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc, timeout)
+    conns = getattr(_conn_local, "conns", None)
+    if conns is None:
+        conns = _conn_local.conns = {}
+
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    for attempt in range(2):
+        conn = conns.get(key)
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(parts.netloc, timeout=timeout)
+            conns[key] = conn
+        try:
+            conn.request("POST", path, body=body, headers=_JSON_HEADERS)
+            resp = conn.getresponse()
+            return resp.status, resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conns.pop(key, None)
+            if attempt == 1:
+                raise
+
+
 def call_rag(endpoint, question, timeout=60):
     """
     Makes an HTTP POST request to the RAG endpoint.
     Returns a dictionary with 'data', 'latency_ms', 'error', 'http_status'.
     """
-    start_time = datetime.now()
+    # time.monotonic over datetime.now: one cheap clock read per edge, no
+    # datetime object allocation, and immune to wall-clock adjustments.
+    start = time.monotonic()
+    payload = _json_dumps_bytes({"query": question})
     try:
-        payload = json.dumps({"query": question}).encode('utf-8')
-        headers = {"Content-Type": "application/json"}
-        req = request.Request(endpoint, data=payload, headers=headers)
-        with request.urlopen(req, timeout=timeout) as resp:
-            data = json.loads(resp.read().decode('utf-8'))
-            latency_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-            return {"data": data, "latency_ms": latency_ms, "error": None, "http_status": resp.getcode()}
-    except error.HTTPError as e:
-        latency_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-        return {"data": None, "latency_ms": latency_ms, "error": str(e), "http_status": e.code}
+        status, raw = _pooled_post(endpoint, payload, timeout)
+        latency_ms = int((time.monotonic() - start) * 1000)
+        if status >= 400:
+            return {"data": None, "latency_ms": latency_ms,
+                    "error": f"HTTP Error {status}: {raw[:200].decode('utf-8', 'replace')}",
+                    "http_status": status}
+        data = _json_loads(raw)
+        return {"data": data, "latency_ms": latency_ms, "error": None, "http_status": status}
     except Exception as e:
-        latency_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        latency_ms = int((time.monotonic() - start) * 1000)
         return {"data": None, "latency_ms": latency_ms, "error": str(e), "http_status": None}
 
 
+def call_rag_batch(endpoint, questions, timeout=120):
+    """
+    Sends several questions in one webhook call ({"queries": [...]}) to
+    amortize n8n per-request startup, and returns a list of per-question
+    result dicts shaped like call_rag's. Workflows that don't understand
+    the batched schema won't return one item per query — in that case
+    (or on any transport error) this falls back to per-question call_rag,
+    so callers can use it unconditionally.
+    """
+    payload_queries = [{"id": q["id"], "query": q["question"]} for q in questions]
+    start = time.monotonic()
+    try:
+        payload = _json_dumps_bytes({"queries": payload_queries})
+        status, raw = _pooled_post(endpoint, payload, timeout)
+        data = _json_loads(raw) if status < 400 else None
+        latency_ms = int((time.monotonic() - start) * 1000)
+    except Exception:
+        data = None
+        latency_ms = None
+
+    if isinstance(data, list) and len(data) == len(questions):
+        # Batched response — align by id when provided, else by position
+        by_id = {item.get("id"): item for item in data
+                 if isinstance(item, dict) and item.get("id")}
+        per_q = latency_ms // len(questions) if latency_ms else 0
+        return [{"data": by_id.get(q["id"], data[i]), "latency_ms": per_q,
+                 "error": None, "http_status": 200}
+                for i, q in enumerate(questions)]
+
+    # Workflow doesn't support batching — one call per question
+    return [call_rag(endpoint, q["question"], timeout=timeout) for q in questions]
+
+
+# Common response field names, in priority order
+_ANSWER_KEYS = ("response", "answer", "result", "interpretation", "final_response")
+
+
 def extract_answer(response_data):
     """
     Extracts the final answer from the RAG pipeline's response data.
@@ -52,10 +142,10 @@ def extract_answer(response_data):
         response_data = response_data[0] if response_data else {}
     if not isinstance(response_data, dict):
         return str(response_data) if response_data else ""
-    # Try multiple common response field names
-    for key in ["response", "answer", "result", "interpretation", "final_response"]:
-        if key in response_data and response_data[key]:
-            return str(response_data[key])
+    # Single dict.get per candidate key instead of an `in` + index pair
+    answer = next((response_data[k] for k in _ANSWER_KEYS if response_data.get(k)), None)
+    if answer is not None:
+        return answer if isinstance(answer, str) else str(answer)
     # Fallback to nested output
     output = response_data.get("output", {})
     if isinstance(output, dict):
@@ -63,12 +153,35 @@ def extract_answer(response_data):
     return ""
 
 
+# Normalization: one regex for the digit-comma case (needs lookaround
+# context), then a single C-level translate pass for punctuation/currency
+# and a split/join for whitespace collapse — down from five passes over
+# the string.
+_NUM_COMMA_RE = re.compile(r'(\d),(\d)')
+_PUNCT_CHARS = '.,;:!?\'"()[]{}-'
+_PUNCT_TABLE = str.maketrans(_PUNCT_CHARS, ' ' * len(_PUNCT_CHARS), '$%')
+
+
+@lru_cache(maxsize=4096)
+def _normalize(text):
+    """Normalize text for matching: remove number commas, strip punctuation
+    (so "Newton," matches "Newton"), collapse whitespace (including unicode
+    separators), drop $/%. Cached — expected answers repeat across calls."""
+    text = _NUM_COMMA_RE.sub(r'\1\2', text)
+    return ' '.join(text.translate(_PUNCT_TABLE).split())
+
+
+@lru_cache(maxsize=4096)
+def _token_counts(text):
+    """Token multiset of a normalized string, cached across calls."""
+    return Counter(text.split())
+
+
 def evaluate_answer(answer, expected_answer):
     """
     Evaluates the extracted answer against the expected answer.
     Returns a dictionary with 'correct', 'method', 'f1'.
     """
-    import re
     answer_lower = answer.lower().strip()
     expected_lower = expected_answer.lower().strip()
 
@@ -76,19 +189,8 @@ def evaluate_answer(answer, expected_answer):
         # No expected answer — just check non-empty response
         return {"correct": len(answer_lower) > 10, "method": "NON_EMPTY", "f1": 1.0 if len(answer_lower) > 10 else 0.0}
 
-    # Normalize numbers: remove commas, $, % for comparison
-    def normalize(text):
-        import unicodedata
-        # Normalize unicode whitespace to regular spaces
-        text = ''.join(' ' if unicodedata.category(c).startswith('Z') else c for c in text)
-        text = re.sub(r'(\d),(\d)', r'\1\2', text)
-        # Strip punctuation from tokens (so "Newton," matches "Newton")
-        text = re.sub(r'[.,;:!?\'"()\[\]{}\-]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.replace('$', '').replace('%', '').strip()
-
-    norm_answer = normalize(answer_lower)
-    norm_expected = normalize(expected_lower)
+    norm_answer = _normalize(answer_lower)
+    norm_expected = _normalize(expected_lower)
 
     if norm_answer == norm_expected:
         return {"correct": True, "method": "EXACT_MATCH", "f1": 1.0}
@@ -97,16 +199,22 @@ def evaluate_answer(answer, expected_answer):
     elif norm_answer in norm_expected:
         return {"correct": True, "method": "SUBSET_MATCH", "f1": 0.8}
     else:
-        # Token-level F1 for partial matches
-        answer_tokens = set(norm_answer.split())
-        expected_tokens = set(norm_expected.split())
-        if not expected_tokens:
+        # Token-level F1 for partial matches. Multiset (Counter) overlap, as
+        # in SQuAD evaluation — a set would collapse repeated tokens and
+        # inflate precision/recall on answers like "New York New York".
+        # Expected answers are fixed per question, so their token multiset
+        # is served from the cache instead of rebuilt per evaluation.
+        answer_counts = Counter(norm_answer.split())
+        expected_counts = _token_counts(norm_expected)
+        n_expected = sum(expected_counts.values())
+        if not n_expected:
             return {"correct": False, "method": "NO_MATCH", "f1": 0.0}
-        overlap = answer_tokens & expected_tokens
+        overlap = sum((answer_counts & expected_counts).values())
         if not overlap:
             return {"correct": False, "method": "NO_MATCH", "f1": 0.0}
-        precision = len(overlap) / len(answer_tokens) if answer_tokens else 0
-        recall = len(overlap) / len(expected_tokens)
+        n_answer = sum(answer_counts.values())
+        precision = overlap / n_answer if n_answer else 0
+        recall = overlap / n_expected
         f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
         # Consider correct if F1 >= 0.5 OR recall == 1.0 (all expected tokens found)
         is_correct = f1 >= 0.5 or recall >= 1.0
@@ -128,6 +236,13 @@ def extract_pipeline_details(response_data, rag_type):
     return {"rag_type": rag_type, "response_keys": list(response_data.keys())}
 
 
+def _load_json_file(path):
+    """Parse a dataset file from bytes — routes through orjson when present,
+    which matters for phase-2's multi-MB question file."""
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
 def load_questions(include_1000=False, dataset="phase-1"):
     """
     Loads questions from specified dataset files.
@@ -142,33 +257,31 @@ def load_questions(include_1000=False, dataset="phase-1"):
         
         for pf in phase1_files:
             if os.path.exists(pf):
-                with open(pf) as f:
-                    data = json.load(f)
-                    for q in data.get("questions", []):
-                        # Use 'rag_target' to group questions
-                        rag_target = q.get("rag_target", "unknown")
-                        questions[rag_target].append({
-                            "id": q["id"],
-                            "question": q["question"],
-                            "expected": q["expected_answer"], # Use expected_answer
-                            "rag_type": rag_target # Store for later use
-                        })
-            else:
-                print(f"Warning: Dataset file not found: {pf}")
-
-    elif dataset == "phase-2":
-        phase2_file = os.path.join(DATASETS_DIR, "phase-2", "hf-1000.json")
-        if os.path.exists(phase2_file):
-            with open(phase2_file) as f:
-                data = json.load(f)
+                data = _load_json_file(pf)
                 for q in data.get("questions", []):
+                    # Use 'rag_target' to group questions
                     rag_target = q.get("rag_target", "unknown")
                     questions[rag_target].append({
                         "id": q["id"],
                         "question": q["question"],
-                        "expected": q["expected_answer"],
-                        "rag_type": rag_target
+                        "expected": q["expected_answer"], # Use expected_answer
+                        "rag_type": rag_target # Store for later use
                     })
+            else:
+                print(f"Warning: Dataset file not found: {pf}")
+
+    elif dataset == "phase-2":
+        phase2_file = os.path.join(DATASETS_DIR, "phase-2", "hf-1000.json")
+        if os.path.exists(phase2_file):
+            data = _load_json_file(phase2_file)
+            for q in data.get("questions", []):
+                rag_target = q.get("rag_target", "unknown")
+                questions[rag_target].append({
+                    "id": q["id"],
+                    "question": q["question"],
+                    "expected": q["expected_answer"],
+                    "rag_type": rag_target
+                })
         else:
             print(f"Warning: Dataset file not found: {phase2_file}")
     
@@ -183,6 +296,13 @@ def load_questions(include_1000=False, dataset="phase-1"):
         for p_type, q_list in phase2_q.items():
             questions.setdefault(p_type, []).extend(q_list)
 
+    # Warm the normalization/token caches for the static expected side now,
+    # at load time — evaluate_answer then serves every expected answer from
+    # cache and only the live webhook response needs parsing in the loop.
+    for q_list in questions.values():
+        for q in q_list:
+            _token_counts(_normalize(q["expected"].lower().strip()))
+
     return questions
 
 
@@ -197,10 +317,26 @@ def load_tested_ids_by_type():
     return {}
 
 
+_last_saved_counts = None
+
+
 def save_tested_ids(tested_ids_by_type):
     """
     Saves tested question IDs to TESTED_IDS_FILE.
+
+    Writes atomically (temp file + os.replace) so an interrupted run never
+    leaves a truncated dedup file, and skips the write entirely when no new
+    IDs were added since the last save.
     """
-    with open(TESTED_IDS_FILE, "w") as f:
+    global _last_saved_counts
+    counts = {k: len(v) for k, v in tested_ids_by_type.items()}
+    if counts == _last_saved_counts:
+        return
+    tmp_path = TESTED_IDS_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump({k: list(v) for k, v in tested_ids_by_type.items()}, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, TESTED_IDS_FILE)
+    _last_saved_counts = counts
 
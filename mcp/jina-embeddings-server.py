@@ -21,17 +21,30 @@ Environment:
     N8N_API_KEY          — For updating n8n workflow variables
     N8N_HOST             — n8n Docker URL (default: http://34.136.180.66:5678)
 """
+import http.client
 import json
 import os
 import asyncio
+import threading
 from datetime import datetime
-from urllib import request, error
+from urllib.parse import urlsplit
 from typing import Any
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+# orjson parses/serializes the large payloads this server moves around
+# (embedding matrices, Pinecone stats with per-namespace counts) ~3-5x
+# faster than stdlib json. Optional — stdlib fallback when not installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps_bytes = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps_bytes = lambda obj: json.dumps(obj).encode()
+
 # ============================================================
 # Configuration
 # ============================================================
@@ -59,20 +72,57 @@ server = Server("jina-embeddings")
 # HTTP helpers (sync — run in executor for async context)
 # ============================================================
 
+# Per-thread keep-alive connections, keyed by (scheme, host). The server
+# talks to a handful of hosts (Jina, OpenRouter, Pinecone, n8n) hundreds
+# of times per session; pooling pays the TCP/TLS handshake once per host
+# per worker thread instead of per call.
+_conn_local = threading.local()
+
+
+def _pooled_request(method, url, body, headers, timeout):
+    """Send a request over a per-thread keep-alive connection.
+    Returns (status, raw_bytes). Reconnects once if the pooled socket
+    went stale (server closed it between calls)."""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    conns = getattr(_conn_local, "conns", None)
+    if conns is None:
+        conns = _conn_local.conns = {}
+
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    for attempt in range(2):
+        conn = conns.get(key)
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(parts.netloc, timeout=timeout)
+            conns[key] = conn
+        elif conn.timeout != timeout:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conns.pop(key, None)
+            if attempt == 1:
+                raise
+
+
 def http_request(url, method="GET", body=None, headers=None, timeout=30):
     """Make an HTTP request and return parsed JSON."""
-    data = json.dumps(body).encode() if body else None
-    req = request.Request(url, data=data, headers=headers or {}, method=method)
+    data = _json_dumps_bytes(body) if body else None
     try:
-        with request.urlopen(req, timeout=timeout) as resp:
-            if resp.status == 204:
-                return {}
-            return json.loads(resp.read())
-    except error.HTTPError as e:
-        err_body = e.read().decode()[:500] if hasattr(e, 'read') else ""
-        return {"error": True, "status": e.code, "message": err_body}
+        status, raw = _pooled_request(method, url, data, headers or {}, timeout)
     except Exception as e:
         return {"error": True, "message": str(e)}
+    if status == 204:
+        return {}
+    if status >= 400:
+        return {"error": True, "status": status, "message": raw.decode()[:500]}
+    return _json_loads(raw)
 
 
 def get_embedding_provider():
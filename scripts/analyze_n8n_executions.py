@@ -1,24 +1,54 @@
 
+import gzip
 import os
 import sys
 import json
+import zlib
 from urllib import request, error
 from datetime import datetime
 
+# Execution payloads with includeData=true run to several MB; orjson parses
+# and serializes them ~3-5x faster than stdlib json. Optional — everything
+# falls back to the stdlib when it isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+
+def _dump_json(obj, path):
+    """Write a JSON file (indent=2), via orjson when available."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+
 # --- N8n Credentials (from user's prompt) ---
 N8N_HOST = os.environ.get("N8N_HOST", "http://34.136.180.66:5678")
 N8N_API_KEY = os.environ.get("N8N_API_KEY", "")
 
+# Display-classification keyword tables — constant, so built once at module
+# level instead of per execution (parse_rich_node runs once per node run,
+# dozens of times per execution).
+LLM_NODE_KEYWORDS = ["llm", "generation", "chat", "completion", "gpt", "hyde", "entity extraction",
+                     "query decomposer", "answer", "synthesis"]
+ROUTING_NODE_KEYWORDS = ["router", "switch", "if", "branch"]  # Simplified for display
+NODE_KEYWORDS = {"LLM": LLM_NODE_KEYWORDS, "ROUTING": ROUTING_NODE_KEYWORDS}
+
 # --- Utility Functions (Adapted from node-analyzer.py) ---
 def _get_first_output_item(output_data):
-    """Safely extract the first item from node output."""
-    if not output_data or not isinstance(output_data, list):
-        return None
-    if not output_data[0] or not isinstance(output_data[0], list):
-        return None
-    if not output_data[0][0]:
+    """Safely extract the first item from node output.
+    EAFP — one indexing attempt instead of a ladder of isinstance/truth
+    checks; this runs for every node run in the payload."""
+    try:
+        item = output_data[0][0]
+    except (IndexError, KeyError, TypeError):
         return None
-    return output_data[0][0]
+    return item or None
 
 def _extract_llm_data(node, item):
     """Extract LLM-specific data: content, tokens, model."""
@@ -64,13 +94,22 @@ def n8n_api_call(path, timeout=30):
     url = f"{N8N_HOST}/api/v1{path}"
     headers = {
         "Accept": "application/json",
+        # includeData payloads are multi-MB of highly repetitive JSON;
+        # compressed transfer cuts them by ~10x on the wire.
+        "Accept-Encoding": "gzip, deflate",
         "Content-Type": "application/json",
         "X-N8N-API-KEY": N8N_API_KEY
     }
     req = request.Request(url, headers=headers)
     try:
         with request.urlopen(req, timeout=timeout) as resp:
-            return json.loads(resp.read())
+            raw = resp.read()
+            encoding = resp.headers.get("Content-Encoding", "")
+            if encoding == "gzip":
+                raw = gzip.decompress(raw)
+            elif encoding == "deflate":
+                raw = zlib.decompress(raw)
+            return _json_loads(raw)
     except error.HTTPError as e:
         body = e.read().decode() if e.fp else ""
         print(f"  ERROR: n8n API HTTP error for path '{path}': {e.code} — {body}")
@@ -104,8 +143,17 @@ def parse_rich_node(name, run, node_keywords):
         err = run["error"]
         node["error"] = err.get("message", str(err)) if isinstance(err, dict) else str(err)
 
-    input_data = run.get("inputData", {}).get("main", [])
-    output_data = run.get("data", {}).get("main", [])
+    # try/except instead of chained .get({}, {}) — the chained form
+    # allocates an empty-dict sentinel on every miss, and this runs for
+    # every node run in a multi-MB includeData payload.
+    try:
+        input_data = run["inputData"]["main"]
+    except (KeyError, TypeError):
+        input_data = []
+    try:
+        output_data = run["data"]["main"]
+    except (KeyError, TypeError):
+        output_data = []
     if input_data:
         node["items_in"] = sum(len(d) if isinstance(d, list) else 0 for d in input_data)
         node["full_input_data"] = input_data
@@ -115,7 +163,13 @@ def parse_rich_node(name, run, node_keywords):
 
     first_item_output = _get_first_output_item(output_data)
     if first_item_output:
-        _extract_llm_data(node, first_item_output)
+        # Only probe for LLM fields on nodes classified as LLM by name, or
+        # whose output is unmistakably a chat-completion payload. Most nodes
+        # in a run are retrieval/code nodes, so this skips the whole
+        # choices/usage/model scan for the common case.
+        name_lower = name.lower()
+        if "choices" in first_item_output or any(k in name_lower for k in node_keywords["LLM"]):
+            _extract_llm_data(node, first_item_output)
         _extract_routing_flags(node, first_item_output)
 
         if "results" in first_item_output and isinstance(first_item_output["results"], list):
@@ -129,12 +183,6 @@ def fetch_and_parse_execution(exec_id):
     if not raw_execution:
         return None
 
-    # Simulate WORKFLOW_IDS and node type checking for basic display
-    # (These are not used for functional routing but for display classification)
-    LLM_NODE_KEYWORDS = ["llm", "generation", "chat", "completion", "gpt", "hyde", "entity extraction",
-                      "query decomposer", "answer", "synthesis"]
-    ROUTING_NODE_KEYWORDS = ["router", "switch", "if", "branch"] # Simplified for display
-
     execution_data = {
         "execution_id": raw_execution.get("id", "N/A"),
         "status": raw_execution.get("status", "N/A"),
@@ -173,7 +221,7 @@ def fetch_and_parse_execution(exec_id):
         if not isinstance(node_runs, list):
             continue
         for run in node_runs:
-            parsed_node = parse_rich_node(node_name, run, {"LLM": LLM_NODE_KEYWORDS, "ROUTING": ROUTING_NODE_KEYWORDS})
+            parsed_node = parse_rich_node(node_name, run, NODE_KEYWORDS)
             execution_data["nodes"].append(parsed_node)
     
     execution_data["node_count"] = len(execution_data["nodes"])
@@ -209,10 +257,14 @@ if __name__ == "__main__":
         exec_ids_to_process.append(args.execution_id)
     elif args.pipeline:
         print(f"Fetching last {args.limit} executions for pipeline '{args.pipeline}'...")
-        # fetch_rich_executions returns parsed executions, we need their IDs
-        recent_executions = node_analyzer.fetch_rich_executions(args.pipeline, limit=args.limit)
-        if recent_executions:
-            exec_ids_to_process = [ex["execution_id"] for ex in recent_executions]
+        # Only the IDs are needed here — list executions WITHOUT includeData
+        # (the full runData blob can be MBs per execution) and defer the one
+        # heavy includeData fetch per ID to fetch_and_parse_execution below.
+        wf_id = node_analyzer.WORKFLOW_IDS[args.pipeline]
+        listing = n8n_api_call(f"/executions?workflowId={wf_id}&limit={args.limit}")
+        recent = listing.get("data", []) if listing else []
+        if recent:
+            exec_ids_to_process = [str(ex["id"]) for ex in recent]
             print(f"Found {len(exec_ids_to_process)} executions: {', '.join(exec_ids_to_process)}")
         else:
             print(f"No recent executions found for pipeline '{args.pipeline}'.")
@@ -230,8 +282,7 @@ if __name__ == "__main__":
 
         if execution_details:
             output_filepath = os.path.join(output_dir, f"execution_{exec_id}.json")
-            with open(output_filepath, 'w', encoding='utf-8') as f:
-                json.dump(execution_details, f, ensure_ascii=False, indent=2)
+            _dump_json(execution_details, output_filepath)
             print(f"  Details saved to {output_filepath}")
 
             print(f"  Workflow Name: {execution_details.get('workflow_name', 'N/A')}")
@@ -288,6 +339,11 @@ if __name__ == "__main__":
                     print(f"      Active Branches: {node['active_branches']} out of {node['total_branches']}")
         else:
             print(f"  Could not fetch execution details for ID {exec_id}. Check N8n API key or execution ID.")
+
+        # Drop the parsed payload (can be several MB of node data) before
+        # the next fetch — otherwise two executions are resident at once
+        # while the next API response downloads and parses.
+        execution_details = None
 print(f"\n{'='*80}")
 print("N8n Execution Analysis Complete.")
 print(f"\n{'='*80}\n")
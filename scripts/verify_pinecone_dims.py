@@ -18,7 +18,7 @@ def call_api(url, method, headers, data=None):
     req = request.Request(url, data=body, method=method, headers=headers)
     try:
         with request.urlopen(req) as resp:
-            return json.loads(resp.read().decode())
+            return json.loads(resp.read())
     except error.HTTPError as e:
         body_content = e.read().decode() if e.fp else ""
         print(f"ERROR: API HTTP error {e.code} for {url}: {body_content}")